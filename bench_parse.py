@@ -0,0 +1,69 @@
+"""Benchmark song page parsing per backend: time and peak memory per page.
+
+Usage: python bench_parse.py [saved_genius_page.html ...]
+Without arguments a synthetic Genius-like page is used.
+"""
+import json
+import sys
+import time
+import tracemalloc
+
+from main import HAS_LXML, parse_song_page
+
+RUNS = 20
+
+def synthetic_page():
+    """Roughly the shape of a real Genius page: lots of scripts and chrome around the lyrics"""
+    chrome = ''.join(
+        f'<div class="PageGriddesktop__Item-{i}"><ul>' + '<li><a href="/tags/{0}">Tag {0}</a></li>'.format(i) * 20 + '</ul></div>'
+        for i in range(200)
+    )
+    lyrics = '<br/>'.join(f'Line {i} of the song, with <a href="/annotation/{i}">annotated</a> words' for i in range(80))
+    state = {
+        'songPage': {'song': 1, 'lyricsData': {'body': {'html': '<p>' + lyrics + '</p>'}}, 'padding': 'x' * 200000},
+        'entities': {'songs': {'1': {'title': 'Song Title', 'artistNames': 'Someone', 'album': 2}}, 'albums': {'2': {'name': 'Album'}}}
+    }
+    state_js = json.dumps(state).replace('\\', '\\\\').replace("'", "\\'")
+    scripts = '<script>window.__PRELOADED_STATE__ = JSON.parse(\'' + state_js + '\');</script>'
+    return (
+        '<html><head><title>Song Lyrics</title>' + scripts + '</head><body>'
+        '<h1 class="SongHeaderdesktop__Title">Song Title</h1>'
+        '<a class="HeaderArtistAndTracklistdesktop__Artist" href="/artists/Someone">Someone</a>'
+        '<a href="/albums/Someone/Album">Album</a>'
+        + chrome +
+        '<div data-lyrics-container="true" class="Lyrics__Container">' + lyrics + '</div>'
+        + chrome + '</body></html>'
+    )
+
+def measure(html, backend, strained, mode):
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        parse_song_page(html, 'https://genius.com/bench', backend, strained, mode)
+    elapsed = (time.perf_counter() - start) / RUNS
+
+    tracemalloc.start()
+    parse_song_page(html, 'https://genius.com/bench', backend, strained, mode)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+def main():
+    pages = [(path, open(path, encoding='utf-8').read()) for path in sys.argv[1:]]
+    if not pages:
+        pages = [('synthetic', synthetic_page())]
+
+    configs = [('html.parser', False, 'dom'), ('html.parser', True, 'dom')]
+    if HAS_LXML:
+        configs += [('lxml', False, 'dom'), ('lxml', True, 'dom')]
+    # Falls back to the DOM rows above when a page has no embedded state
+    configs.append(('html.parser', True, 'auto'))
+
+    for name, html in pages:
+        print(f"{name} ({len(html) // 1024} KB)")
+        for backend, strained, mode in configs:
+            elapsed, peak = measure(html, backend, strained, mode)
+            label = 'embedded JSON' if mode == 'auto' else f"{backend}{' + strainer' if strained else ''}"
+            print(f"  {label:<24} {elapsed * 1000:8.1f} ms/page  {peak / 1024 / 1024:7.2f} MB peak")
+
+if __name__ == "__main__":
+    main()
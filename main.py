@@ -1,13 +1,44 @@
 import discord
+from discord import app_commands
 from discord.ext import commands
 import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
+import backoff
+from bs4 import BeautifulSoup, SoupStrainer
 import re
 import os
 from dotenv import load_dotenv
 import json
 import random
+import time
+import sqlite3
+import threading
+import zlib
+import concurrent.futures
+import contextlib
+import contextvars
+import codecs
+from html.parser import HTMLParser
+import html as html_lib
+import unicodedata
+from email.utils import parsedate_to_datetime
+from array import array
+import heapq
+import io
+import bisect
+from collections import OrderedDict
+
+# Optional faster parser backends
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from bs4.filter import ElementFilter
+except ImportError:  # bs4 < 4.13 has no tag-creation filters
+    ElementFilter = None
 
 # Load environment variable
 load_dotenv()
@@ -17,298 +48,1990 @@ intents = discord.Intents.default()
 intents.message_content = True
 bot = commands.Bot(command_prefix='/', intents=intents)
 
+# Scraper cache settings
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '1024'))
+CACHE_TTL_SECONDS = float(os.getenv('CACHE_TTL_SECONDS', '21600'))
+# Entries older than this are still served but refreshed in the background
+CACHE_SOFT_TTL_SECONDS = float(os.getenv('CACHE_SOFT_TTL_SECONDS', '3600'))
+REFRESH_CONCURRENCY = int(os.getenv('REFRESH_CONCURRENCY', '2'))
+REFRESH_JITTER_SECONDS = float(os.getenv('REFRESH_JITTER_SECONDS', '5'))
+# Local fuzzy index: minimum trigram similarity to trust a match without searching Genius
+INDEX_MIN_CONFIDENCE = float(os.getenv('INDEX_MIN_CONFIDENCE', '0.75'))
+# Pre-resolve the /recommend and /mood catalogs in the background at startup
+WARMUP_ON_START = os.getenv('WARMUP_ON_START', '1') == '1'
+WARMUP_INTERVAL_SECONDS = float(os.getenv('WARMUP_INTERVAL_SECONDS', '2'))
+# Slash command registration is rate limited, so by default it only happens through the owner's /sync;
+# autocomplete offers at most 25 names
+SYNC_COMMANDS_ON_START = os.getenv('SYNC_COMMANDS_ON_START', '0') == '1'
+AUTOCOMPLETE_LIMIT = min(int(os.getenv('AUTOCOMPLETE_LIMIT', '25')), 25)
+# Prefetch lyrics for playlist songs: queue bound, worker count and how many upcoming songs to cover
+PREFETCH_QUEUE_SIZE = int(os.getenv('PREFETCH_QUEUE_SIZE', '50'))
+PREFETCH_WORKERS = int(os.getenv('PREFETCH_WORKERS', '1'))
+PREFETCH_AHEAD = int(os.getenv('PREFETCH_AHEAD', '3'))
+# Short-lived memory of failed lookups: "no such song" vs "Genius was unavailable"
+NEGATIVE_TTL_SECONDS = float(os.getenv('NEGATIVE_TTL_SECONDS', '300'))
+ERROR_TTL_SECONDS = float(os.getenv('ERROR_TTL_SECONDS', '15'))
+# Persistent lyrics store (set LYRICS_DB_PATH to an empty string to disable)
+LYRICS_DB_PATH = os.getenv('LYRICS_DB_PATH', 'lyrics_cache.db')
+# HTML parsing pool ('thread' or 'process')
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', '2'))
+PARSE_POOL_KIND = os.getenv('PARSE_POOL_KIND', 'thread')
+# HTML parser backend ('auto', 'lxml' or 'html.parser') and whether to build only the subtrees we read
+PARSER_BACKEND = os.getenv('PARSER_BACKEND', 'auto')
+PARSE_STRAINED = os.getenv('PARSE_STRAINED', '1') == '1'
+# Song page extraction: 'auto' reads the embedded JSON state first, 'dom' always walks the HTML
+EXTRACTION_MODE = os.getenv('EXTRACTION_MODE', 'auto')
+# Song search: 'api' uses the public JSON endpoint and falls back to the HTML page, 'html' scrapes only
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'api')
+# Shared outbound limit for every request to genius.com
+GENIUS_RATE = float(os.getenv('GENIUS_RATE', '2'))
+GENIUS_BURST = int(os.getenv('GENIUS_BURST', '5'))
+RATE_LIMIT_RETRIES = int(os.getenv('RATE_LIMIT_RETRIES', '2'))
+# Retries for transient failures and the circuit breaker that stops calling a dead Genius
+RETRY_MAX_TRIES = int(os.getenv('RETRY_MAX_TRIES', '3'))
+RETRY_MAX_DELAY = float(os.getenv('RETRY_MAX_DELAY', '8'))
+ATTEMPT_TIMEOUT = float(os.getenv('ATTEMPT_TIMEOUT', '10'))
+BREAKER_FAILURES = int(os.getenv('BREAKER_FAILURES', '5'))
+BREAKER_RESET_SECONDS = float(os.getenv('BREAKER_RESET_SECONDS', '30'))
+# HTTP connection pool and timeouts for the scraper session
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '100'))
+HTTP_LIMIT_PER_HOST = int(os.getenv('HTTP_LIMIT_PER_HOST', '10'))
+DNS_CACHE_TTL = int(os.getenv('DNS_CACHE_TTL', '300'))
+KEEPALIVE_TIMEOUT = float(os.getenv('KEEPALIVE_TIMEOUT', '30'))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '3'))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '5'))
+# End-to-end budget for a command's search -> fetch -> parse pipeline
+COMMAND_DEADLINE = float(os.getenv('COMMAND_DEADLINE', '12'))
+# Lyrics are shown a page at a time; page buttons stop working after the timeout
+LYRICS_PAGE_CHARS = int(os.getenv('LYRICS_PAGE_CHARS', '1872'))
+PAGINATOR_TIMEOUT = float(os.getenv('PAGINATOR_TIMEOUT', '300'))
+
+# Bot messages are paced per channel, under Discord's budget of about 5 messages per 5 seconds
+CHANNEL_SEND_RATE = float(os.getenv('CHANNEL_SEND_RATE', '1'))
+CHANNEL_SEND_BURST = int(os.getenv('CHANNEL_SEND_BURST', '5'))
+
+# Streaming song page fetch that stops downloading once the lyrics have been read
+STREAM_FETCH = os.getenv('STREAM_FETCH', '0') == '1'
+STREAM_CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', '16384'))
+STREAM_GAP_CHARS = int(os.getenv('STREAM_GAP_CHARS', '65536'))
+
+# Monotonic deadline of the command being served, read by every stage below it
+current_deadline = contextvars.ContextVar('current_deadline', default=None)
+
+class SharedDeadline:
+    """Deadline of a lookup shared by several callers: the latest deadline among those still waiting"""
+    def __init__(self):
+        # One entry per waiter: a monotonic time, a SharedDeadline when nested, or None for no deadline
+        self.deadlines = []
+
+    def join(self, deadline):
+        self.deadlines.append(deadline)
+
+    def leave(self, deadline):
+        self.deadlines.remove(deadline)
+
+    def waiting(self):
+        return bool(self.deadlines)
+
+    @property
+    def at(self):
+        if not self.deadlines:
+            return 0.0
+        times = [deadline.at if isinstance(deadline, SharedDeadline) else deadline for deadline in self.deadlines]
+        return None if None in times else max(times)
+
+def remaining_time(default=None):
+    """Seconds left before the current command's deadline, or default outside a command"""
+    deadline = current_deadline.get()
+    if isinstance(deadline, SharedDeadline):
+        deadline = deadline.at
+    if deadline is None:
+        return default
+    return max(0.0, deadline - time.monotonic())
+
+@contextlib.asynccontextmanager
+async def command_deadline(seconds=COMMAND_DEADLINE):
+    """Cancel whatever stage is running once seconds have passed, raising TimeoutError"""
+    token = current_deadline.set(time.monotonic() + seconds)
+    try:
+        async with asyncio.timeout(seconds):
+            yield
+    finally:
+        current_deadline.reset(token)
+
+def create_http_session(headers):
+    """aiohttp session with a bounded, keep-alive connection pool, DNS caching and timeouts"""
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_SIZE,
+        limit_per_host=HTTP_LIMIT_PER_HOST,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        keepalive_timeout=KEEPALIVE_TIMEOUT
+    )
+    timeout = aiohttp.ClientTimeout(total=ATTEMPT_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT, sock_read=HTTP_READ_TIMEOUT)
+    return aiohttp.ClientSession(headers=headers, connector=connector, timeout=timeout)
+
+# Featuring credits and remaster tags don't change which song is meant
+BRACKETED_EXTRA = re.compile(r'[\(\[][^\)\]]*\b(feat|ft|featuring|remaster(ed)?)\b[^\)\]]*[\)\]]')
+TRAILING_FEATURE = re.compile(r'\s(feat|ft|featuring)\b.*$')
+REMASTER_TAG = re.compile(r'^((\d{4}\s+)?(digital\s+)?remaster(ed)?(\s+\d{4})?(\s+version)?)?$')
+TITLE_ARTIST_SEPARATOR = re.compile(r'\s+[-\u2013\u2014]\s+')
+APOSTROPHE = re.compile(r"['\u2019`]")
+NON_WORD = re.compile(r'[^\w\s]|_')
+
+def canonical_song(query):
+    """Split a free-form query into a normalized (title, artist) pair; artist is '' when absent"""
+    text = unicodedata.normalize('NFKC', query).casefold()
+    text = BRACKETED_EXTRA.sub(' ', text)
+    
+    parts = []
+    for part in TITLE_ARTIST_SEPARATOR.split(text.strip()):
+        part = TRAILING_FEATURE.sub('', part.strip())
+        part = APOSTROPHE.sub('', part).replace('&', ' and ')
+        part = NON_WORD.sub(' ', part)
+        part = ' '.join(part.split())
+        if not REMASTER_TAG.match(part):
+            parts.append(part)
+    
+    if not parts:
+        return '', ''
+    return parts[0], ' '.join(parts[1:])
+
+def normalize_query(query):
+    """Canonical key for a song lookup, shared by caching, request coalescing and indexing"""
+    title, artist = canonical_song(query)
+    return f"{title} {artist}".strip()
+
+class TTLCache:
+    """Bounded in-memory cache with LRU eviction, per-entry TTL and hit/miss counters"""
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, soft_ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.soft_ttl = soft_ttl
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired"""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            # Left in place (until LRU eviction) so get_stale can serve it during an outage
+            self.misses += 1
+            return None
+        
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def get_stale(self, key):
+        """Return the cached value for key even if it has expired"""
+        entry = self.entries.get(key)
+        return entry[0] if entry else None
+
+    def is_stale(self, key):
+        """Whether a live entry is past its soft TTL and due for a background refresh"""
+        entry = self.entries.get(key)
+        if entry is None or entry[2] is None or entry[2] > time.monotonic():
+            return False
+        self.stale_hits += 1
+        return True
+
+    def set(self, key, value, ttl=None, age=0.0):
+        """Store value under key, evicting the least recently used entry when full"""
+        now = time.monotonic()
+        # age is how old value already is, so data loaded from disk is refreshed on schedule
+        refresh_at = now - age + self.soft_ttl if self.soft_ttl is not None else None
+        self.entries[key] = (value, now + (self.ttl if ttl is None else ttl), refresh_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        """Snapshot of cache size and hit/miss counters"""
+        return {'size': len(self.entries), 'hits': self.hits, 'misses': self.misses, 'stale_hits': self.stale_hits}
+
+class LyricsStore:
+    """SQLite-backed song store that survives restarts and is shared between bot processes"""
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        # WAL lets several bot processes on the same host read while one writes
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS songs (
+                url TEXT PRIMARY KEY,
+                title TEXT,
+                artist TEXT,
+                album TEXT,
+                lyrics BLOB,
+                fetched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS queries (
+                query TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS queries_url ON queries (url);
+        ''')
+        self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def load_url(self, query):
+        """Look up (url, fetched_at) previously resolved for a normalized query"""
+        with self.lock:
+            row = self.conn.execute('SELECT url, fetched_at FROM queries WHERE query = ?', (query,)).fetchone()
+        return row
+
+    def save_url(self, query, url):
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO queries (query, url, fetched_at) VALUES (?, ?, ?)',
+                (query, url, time.time())
+            )
+            self.conn.commit()
+
+    def load_page(self, url):
+        """Rebuild a SongPage from the store, or None if the URL was never saved"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT title, artist, album, lyrics, fetched_at FROM songs WHERE url = ?', (url,)
+            ).fetchone()
+        if not row:
+            return None
+        
+        title, artist, album, lyrics, fetched_at = row
+        if lyrics is not None:
+            lyrics = zlib.decompress(lyrics).decode('utf-8')
+        return SongPage(url, lyrics=lyrics, title=title, artist=artist, album=album, fetched_at=fetched_at)
+
+    def load_index_entries(self):
+        """Every stored (title, artist, url) song and (query, url) search, for rebuilding the song indexes"""
+        with self.lock:
+            songs = self.conn.execute('SELECT title, artist, url FROM songs WHERE title IS NOT NULL').fetchall()
+            queries = self.conn.execute('SELECT query, url FROM queries').fetchall()
+        return songs, queries
+
+    def save_page(self, page):
+        # Lyrics compress several times over, keeping the database small
+        lyrics = zlib.compress(page.lyrics.encode('utf-8')) if page.lyrics else None
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO songs (url, title, artist, album, lyrics, fetched_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (page.url, page.title, page.artist, page.album, lyrics, page.fetched_at)
+            )
+            self.conn.commit()
+
+class SongIndex:
+    """In-memory trigram index mapping typed song names to known Genius URLs"""
+    def __init__(self):
+        # One document per distinct (title, artist, url) alias; postings are compact arrays of doc ids
+        self.doc_urls = []
+        self.doc_keys = []
+        self.doc_artists = []
+        self.doc_sizes = array('H')
+        self.postings = {}
+        self.aliases = set()
+        # Every URL behind each artist-less alias key; a title shared by several songs is ambiguous
+        self.key_urls = {}
+        self.lookups = 0
+        self.confident = 0
+
+    @staticmethod
+    def trigrams(key):
+        padded = f"  {key} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    @classmethod
+    def similarity(cls, a, b):
+        """Trigram Dice similarity of two normalized strings"""
+        a_grams, b_grams = cls.trigrams(a), cls.trigrams(b)
+        return 2 * len(a_grams & b_grams) / (len(a_grams) + len(b_grams))
+
+    def add(self, name, url):
+        """Index name (any free-form song query or 'title - artist') as pointing at url"""
+        title, artist = canonical_song(name)
+        key = f"{title} {artist}".strip()
+        if not key or (title, artist, url) in self.aliases:
+            return
+        
+        self.aliases.add((title, artist, url))
+        if not artist:
+            self.key_urls.setdefault(key, set()).add(url)
+        doc_id = len(self.doc_urls)
+        grams = self.trigrams(key)
+        self.doc_urls.append(url)
+        self.doc_keys.append(key)
+        self.doc_artists.append(artist)
+        self.doc_sizes.append(min(len(grams), 0xFFFF))
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array('I')
+            posting.append(doc_id)
+
+    def lookup(self, query):
+        """Best (url, confidence) for a song query, confidence being trigram Dice similarity"""
+        self.lookups += 1
+        title, artist = canonical_song(query)
+        key = f"{title} {artist}".strip()
+        grams = self.trigrams(key)
+        counts = {}
+        for gram in grams:
+            for doc_id in self.postings.get(gram, ()):
+                counts[doc_id] = counts.get(doc_id, 0) + 1
+        
+        best = None
+        artist_matches = {}
+        for doc_id, shared in counts.items():
+            if artist:
+                # A named artist must match: a bare title or another artist's song of that name won't do
+                doc_artist = self.doc_artists[doc_id]
+                if not doc_artist:
+                    continue
+                if doc_artist not in artist_matches:
+                    artist_matches[doc_artist] = self.similarity(artist, doc_artist) >= INDEX_MIN_CONFIDENCE
+                if not artist_matches[doc_artist]:
+                    continue
+            score = 2 * shared / (len(grams) + self.doc_sizes[doc_id])
+            if best is None or score > best[0]:
+                best = (score, doc_id)
+        if best is None:
+            return None
+        
+        score, doc_id = best
+        if not self.doc_artists[doc_id]:
+            # Several songs share this title, so the title alone can't say which one is meant
+            score /= len(self.key_urls[self.doc_keys[doc_id]])
+        return self.doc_urls[doc_id], score
+
+    def resolve(self, query, min_confidence=INDEX_MIN_CONFIDENCE):
+        """URL for query when the index is confident enough, otherwise None"""
+        match = self.lookup(query)
+        if match and match[1] >= min_confidence:
+            self.confident += 1
+            return match[0]
+        return None
+
+    def stats(self):
+        return {'aliases': len(self.doc_urls), 'trigrams': len(self.postings), 'lookups': self.lookups, 'confident': self.confident}
+
+class SongSuggestions:
+    """Sorted prefix index of song names, answering autocomplete without touching the network"""
+    def __init__(self):
+        # Sorted (key, name) pairs with one key per word start of a name,
+        # so typing 'rhapsody' still finds 'Bohemian Rhapsody - Queen'
+        self.entries = []
+        self.keys = set()
+        self.lookups = 0
+
+    def add(self, name):
+        key = normalize_query(name)
+        if not key or key in self.keys:
+            return
+        
+        self.keys.add(key)
+        words = key.split()
+        for i in range(len(words)):
+            bisect.insort(self.entries, (' '.join(words[i:]), name))
+
+    def complete(self, prefix, limit=AUTOCOMPLETE_LIMIT):
+        """Up to limit names with a word starting with prefix, whole-name matches first"""
+        self.lookups += 1
+        key = normalize_query(prefix)
+        start = bisect.bisect_left(self.entries, (key,))
+        leading, inner = [], []
+        for entry_key, name in self.entries[start:start + limit * 4]:
+            if not entry_key.startswith(key):
+                break
+            bucket = leading if normalize_query(name).startswith(key) else inner
+            if name not in leading and name not in inner:
+                bucket.append(name)
+        return (leading + inner)[:limit]
+
+    def stats(self):
+        return {'names': len(self.keys), 'entries': len(self.entries), 'lookups': self.lookups}
+
+DISCORD_MESSAGE_LIMIT = 2000
+# A page is sent as a header line plus the lyrics inside a ``` code block
+CODE_FENCE_OVERHEAD = len("```\n\n```")
+SONG_NAME_DISPLAY_CHARS = 80
+LYRICS_HEADER_RESERVE = SONG_NAME_DISPLAY_CHARS + 40
+SECTION_HEADER = re.compile(r'^\[[^\]]+\]$')
+FILENAME_UNSAFE = re.compile(r'[^\w\- ]')
+
+def discord_length(text):
+    """Length as Discord counts it, in UTF-16 code units, so emoji and other astral characters count double"""
+    return len(text.encode('utf-16-le')) // 2
+
+def truncate_discord(text, limit):
+    """Longest prefix of text within limit UTF-16 code units, never splitting a surrogate pair"""
+    if discord_length(text) <= limit:
+        return text
+    return text.encode('utf-16-le')[:limit * 2].decode('utf-16-le', errors='ignore')
+
+def wrap_long_line(line, size):
+    """Break a single line longer than a page at word boundaries, cutting words only when they alone overflow"""
+    pieces, current, current_size = [], [], 0
+    for word in line.split(' '):
+        word_size = discord_length(word) + 1
+        while word_size > size:
+            # Cut an unbreakable run; halving the size keeps astral characters within the budget
+            head, word = word[:size // 2], word[size // 2:]
+            if current:
+                pieces.append(' '.join(current))
+                current, current_size = [], 0
+            pieces.append(head)
+            word_size = discord_length(word) + 1
+        if current_size + word_size > size:
+            pieces.append(' '.join(current))
+            current, current_size = [], 0
+        current.append(word)
+        current_size += word_size
+    if current:
+        pieces.append(' '.join(current))
+    return pieces
+
+def paginate_lyrics(lyrics, size=LYRICS_PAGE_CHARS):
+    """Pack whole sections, or failing that whole lines, into pages that fit in one Discord message"""
+    size = min(size, DISCORD_MESSAGE_LIMIT - CODE_FENCE_OVERHEAD - LYRICS_HEADER_RESERVE)
+    # A literal ``` in the lyrics would close the code block early
+    lyrics = lyrics.replace('```', '`\u200b`\u200b`')
+    
+    # Group lines into sections, each starting at a [Verse]/[Chorus] style header
+    sections = [[[], 0]]
+    for line in lyrics.split('\n'):
+        if SECTION_HEADER.match(line.strip()) and sections[-1][0]:
+            sections.append([[], 0])
+        sections[-1][0].append(line)
+        sections[-1][1] += discord_length(line) + 1
+    
+    pages, current, current_size = [], [], 0
+    def flush():
+        nonlocal current_size
+        text = '\n'.join(current).strip('\n')
+        if text:
+            pages.append(text)
+        current.clear()
+        current_size = 0
+    
+    for lines, section_size in sections:
+        # Sections move to the next page whole when they fit on one
+        if section_size <= size:
+            if current_size + section_size > size:
+                flush()
+            current.extend(lines)
+            current_size += section_size
+            continue
+        for line in lines:
+            line_size = discord_length(line) + 1
+            for piece in wrap_long_line(line, size) if line_size > size else [line]:
+                piece_size = discord_length(piece) + 1
+                if current_size + piece_size > size:
+                    flush()
+                current.append(piece)
+                current_size += piece_size
+    flush()
+    return pages
+
+class SongPage:
+    """Parsed Genius song page shared by the lyrics and track commands"""
+    def __init__(self, url, lyrics=None, title=None, artist=None, album=None, fetched_at=None):
+        self.url = url
+        self.lyrics = lyrics
+        self.title = title
+        self.artist = artist
+        self.album = album
+        self.fetched_at = fetched_at or time.time()
+        # Lyrics split into message-sized pages and encoded as a text file, computed on first use
+        self.lyric_pages = None
+        self.lyrics_file = None
+
+    def lyric_page_list(self):
+        """Pages of the lyrics, split once and kept with the cached page"""
+        if self.lyric_pages is None and self.lyrics:
+            self.lyric_pages = paginate_lyrics(self.lyrics)
+        return self.lyric_pages
+
+    def lyrics_file_bytes(self):
+        """The full lyrics as UTF-8 text file contents, encoded once and kept with the cached page"""
+        if self.lyrics_file is None and self.lyrics:
+            heading = ' - '.join(part for part in (self.title, self.artist) if part)
+            text = f"{heading}\n{self.url}\n\n{self.lyrics}\n" if heading else f"{self.lyrics}\n"
+            self.lyrics_file = text.encode('utf-8')
+        return self.lyrics_file
+
+    def lyrics_filename(self):
+        name = FILENAME_UNSAFE.sub('', self.title or '').strip() or 'lyrics'
+        return f"{name[:SONG_NAME_DISPLAY_CHARS]}.txt"
+
+    def info(self):
+        """Track metadata in the shape the /track embed expects"""
+        return {
+            'title': self.title or "Unknown Title",
+            'artist': self.artist or "Unknown Artist",
+            'album': self.album or "Unknown Album",
+            'url': self.url
+        }
+
+def resolve_backend(backend=PARSER_BACKEND):
+    """Pick the BeautifulSoup tree builder, preferring lxml when it is installed"""
+    if backend == 'auto':
+        return 'lxml' if HAS_LXML else 'html.parser'
+    if backend == 'lxml' and not HAS_LXML:
+        print("lxml is not installed, falling back to html.parser")
+        return 'html.parser'
+    return backend
+
+if ElementFilter is not None:
+    class SongPageFilter(ElementFilter):
+        """Only build the subtrees song page extraction reads: lyrics, header and link tags"""
+        lyrics_class = re.compile(r'lyrics', re.I)
+        artist_class = re.compile(r'HeaderArtist|artist_link|song_artist')
+        link_href = re.compile(r'/(artists|albums)/')
+
+        def allow_tag_creation(self, nsprefix, name, attrs):
+            attrs = attrs or {}
+            css_class = attrs.get('class') or ''
+            if not isinstance(css_class, str):
+                css_class = ' '.join(css_class)
+            if name == 'div':
+                return attrs.get('data-lyrics-container') == 'true' or bool(self.lyrics_class.search(css_class))
+            if name == 'h1':
+                return True
+            if name == 'a':
+                return bool(self.link_href.search(attrs.get('href') or '') or self.artist_class.search(css_class))
+            if name == 'span':
+                return 'song_artist' in css_class
+            return False
+
+        def allow_string_creation(self, string):
+            # Text outside the kept subtrees is never read
+            return False
+
+    SONG_PAGE_STRAINER = SongPageFilter()
+else:
+    SONG_PAGE_STRAINER = SoupStrainer(['div', 'h1', 'a', 'span'])
+
+# Every search pattern ends up reading an anchor's href
+SEARCH_STRAINER = SoupStrainer('a')
+
+def make_soup(html, strainer=None, backend=PARSER_BACKEND, strained=PARSE_STRAINED):
+    """Parse HTML with the configured backend, optionally limited to a strainer's subtrees"""
+    return BeautifulSoup(html, resolve_backend(backend), parse_only=strainer if strained else None)
+
+def parse_search_results(html, base_url, backend=PARSER_BACKEND, strained=PARSE_STRAINED):
+    """Find the first song link on a Genius search page with improved selectors"""
+    soup = make_soup(html, SEARCH_STRAINER, backend, strained)
+    
+    # Try multiple selector patterns
+    patterns = [
+        ('a', {'class': 'mini_card'}),
+        ('a', {'href': re.compile(r'/.*-lyrics$')}),
+        ('div', {'class': 'search_result'}),
+        ('a', {'class': 'song_link'})
+    ]
+    
+    for tag, attrs in patterns:
+        search_results = soup.find_all(tag, attrs)
+        if search_results:
+            for result in search_results:
+                href = result.get('href')
+                if href and href.startswith('/'):
+                    return base_url + href
+    
+    # If no results found with patterns, try fallback
+    all_links = soup.find_all('a', href=True)
+    for link in all_links:
+        if '-lyrics' in link['href']:
+            return base_url + link['href']
+    
+    return None
+
+class SearchHit:
+    """One song result from the Genius JSON search API"""
+    def __init__(self, url, title, artist, song_id=None, top_hit=False, has_lyrics=True, score=0.0):
+        self.url = url
+        self.title = title
+        self.artist = artist
+        self.song_id = song_id
+        self.top_hit = top_hit
+        self.has_lyrics = has_lyrics
+        self.score = score
+
+# Titles that are Genius pages about a song rather than the song itself (as in lyricsgenius)
+NON_SONG_TITLE = re.compile(r'track\s?list|album art(work)?|liner notes|booklet|credits|interview|skit|instrumental|setlist', re.I)
+
+def rank_search_hits(payload, query):
+    """Collect song hits from a search/multi response and order them by how well they match query"""
+    query_words = set(normalize_query(query).split())
+    hits = {}
+    
+    for section in payload.get('response', {}).get('sections', []):
+        for hit in section.get('hits', []):
+            if hit.get('type') != 'song':
+                continue
+            result = hit.get('result') or {}
+            url = result.get('url')
+            if not url or url in hits:
+                continue
+            
+            title = result.get('title') or ''
+            artist = result.get('artist_names') or (result.get('primary_artist') or {}).get('name') or ''
+            song = SearchHit(
+                url, title, artist,
+                song_id=result.get('id'),
+                top_hit=section.get('type') == 'top_hit',
+                has_lyrics=result.get('lyrics_state') == 'complete' and not result.get('instrumental')
+            )
+            
+            # Word overlap with the query, nudged by Genius's own top hit and away from non-songs
+            song_words = set(normalize_query(f"{title} {artist}").split())
+            if query_words and song_words:
+                song.score = len(query_words & song_words) / len(query_words | song_words)
+            if song.top_hit:
+                song.score += 0.25
+            if not song.has_lyrics or NON_SONG_TITLE.search(title):
+                song.score -= 1.0
+            hits[url] = song
+    
+    # sorted() is stable, so equal scores keep Genius's relevance order
+    return sorted(hits.values(), key=lambda song: song.score, reverse=True)
+
+PRELOADED_STATE_MARKER = "window.__PRELOADED_STATE__ = JSON.parse('"
+# Body of a single-quoted JS string literal, stopping at the first unescaped quote
+JS_STRING_BODY = re.compile(r"[^'\\]*(?:\\.[^'\\]*)*", re.S)
+JS_ESCAPE = re.compile(r'\\(?:x([0-9a-fA-F]{2})|u([0-9a-fA-F]{4})|(.))', re.S)
+JS_SIMPLE_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '0': '\0'}
+LYRICS_BREAK = re.compile(r'<br\s*/?>|</p>|</div>', re.I)
+HTML_TAG = re.compile(r'<[^>]+>')
+
+def decode_js_string(body):
+    """Undo JS string-literal escaping, including \\x and surrogate-pair \\u escapes"""
+    def replace(match):
+        hex_byte, hex_unit, char = match.groups()
+        if hex_byte:
+            return chr(int(hex_byte, 16))
+        if hex_unit:
+            return chr(int(hex_unit, 16))
+        return JS_SIMPLE_ESCAPES.get(char, char)
+    
+    decoded = JS_ESCAPE.sub(replace, body)
+    return decoded.encode('utf-16', 'surrogatepass').decode('utf-16')
+
+def html_fragment_to_text(fragment):
+    """Flatten the lyrics HTML fragment from the JSON state into plain text lines"""
+    text = LYRICS_BREAK.sub('\n', fragment)
+    text = html_lib.unescape(HTML_TAG.sub('', text)).strip()
+    return re.sub(r'\n\s*\n', '\n\n', text)
+
+def extract_preloaded_state(html, song_url):
+    """Read lyrics and metadata from the JSON state Genius embeds in the page, without a DOM"""
+    start = html.find(PRELOADED_STATE_MARKER)
+    if start == -1:
+        return None
+    
+    start += len(PRELOADED_STATE_MARKER)
+    body = JS_STRING_BODY.match(html, start).group(0)
+    state = json.loads(decode_js_string(body))
+    
+    song_page = state['songPage']
+    lyrics_html = song_page['lyricsData']['body']['html']
+    if not lyrics_html:
+        return None
+    
+    entities = state.get('entities', {})
+    song = entities.get('songs', {}).get(str(song_page['song']), {})
+    artist = song.get('artistNames')
+    if not artist and song.get('primaryArtist'):
+        artist = entities.get('artists', {}).get(str(song['primaryArtist']), {}).get('name')
+    album = None
+    if song.get('album'):
+        album = entities.get('albums', {}).get(str(song['album']), {}).get('name')
+    
+    return SongPage(song_url, lyrics=html_fragment_to_text(lyrics_html), title=song.get('title'), artist=artist, album=album)
+
+def parse_song_page(html, song_url, backend=PARSER_BACKEND, strained=PARSE_STRAINED, mode=EXTRACTION_MODE):
+    """Build a SongPage from raw Genius HTML with a single parse"""
+    if mode == 'auto':
+        try:
+            page = extract_preloaded_state(html, song_url)
+            if page and page.lyrics:
+                return page
+        except (ValueError, KeyError, TypeError, AttributeError):
+            # Layout changed or the blob is missing, use the selector chain instead
+            pass
+    
+    soup = make_soup(html, SONG_PAGE_STRAINER, backend, strained)
+    title, artist, album = extract_info(soup)
+    return SongPage(song_url, lyrics=extract_lyrics(soup), title=title, artist=artist, album=album)
+
+def extract_lyrics(soup):
+    """Extract lyrics with improved parsing"""
+    # Try multiple lyric container patterns
+    patterns = [
+        {'data-lyrics-container': 'true'},
+        {'class': re.compile(r'lyrics|Lyrics__Container')},
+        {'class': 'lyrics'},
+        {'class': 'song_body-lyrics'}
+    ]
+    
+    for pattern in patterns:
+        lyrics_divs = soup.find_all('div', pattern)
+        if lyrics_divs:
+            parts = []
+            for lyrics_div in lyrics_divs:
+                # Remove unwanted elements
+                for script in lyrics_div.find_all('script'):
+                    script.decompose()
+                parts.append(lyrics_div.get_text(separator='\n').strip())
+            
+            lyrics = '\n'.join(part for part in parts if part)
+            return re.sub(r'\n\s*\n', '\n\n', lyrics)
+    
+    # Fallback: look for any div containing "lyrics" in class
+    for div in soup.find_all('div', class_=re.compile('lyrics', re.I)):
+        lyrics = div.get_text(separator='\n').strip()
+        if lyrics and len(lyrics) > 50:  # Ensure we have substantial content
+            return re.sub(r'\n\s*\n', '\n\n', lyrics)
+    
+    return None
+
+def extract_info(soup):
+    """Improved song info extraction, returning (title, artist, album)"""
+    # Title extraction with multiple patterns
+    title = None
+    title_patterns = [
+        ('h1', {'class': re.compile(r'SongHeader|song_header')}),
+        ('h1', {'class': 'header_with_cover_art-primary_info-title'}),
+        ('h1', {'class': 'song_title'}),
+        ('h1', None)
+    ]
+    
+    for tag, attrs in title_patterns:
+        title_elem = soup.find(tag, attrs)
+        if title_elem:
+            title = title_elem.get_text().strip()
+            break
+    
+    # Artist extraction
+    artist = None
+    artist_patterns = [
+        ('a', {'class': re.compile(r'HeaderArtist|artist_link')}),
+        ('a', {'href': re.compile(r'/artists/')}),
+        ('span', {'class': 'song_artist'}),
+        ('a', {'class': 'song_artist'})
+    ]
+    
+    for tag, attrs in artist_patterns:
+        artist_elem = soup.find(tag, attrs)
+        if artist_elem:
+            artist = artist_elem.get_text().strip()
+            break
+    
+    # Album extraction
+    album = None
+    album_elem = soup.find('a', href=re.compile(r'/albums/'))
+    if album_elem:
+        album = album_elem.get_text().strip()
+    
+    return title, artist, album
+
+class GeniusUnavailable(Exception):
+    """Genius refused or failed the request, as opposed to the song not existing"""
+
+class DeadlineExceeded(Exception):
+    """The command's time budget ran out before this stage could start"""
+
+class GeniusServerError(Exception):
+    """Genius answered with a 5xx status, which is worth retrying"""
+
+# Failures that a retry has a fair chance of fixing; the GETs we send are all idempotent
+TRANSIENT_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, GeniusServerError)
+
+class CircuitBreaker:
+    """Stops sending requests after repeated failures, probing again after a cool-down"""
+    def __init__(self, failure_threshold=BREAKER_FAILURES, reset_timeout=BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+
+    def allow(self):
+        """Whether a request may go out; one probe is let through once the cool-down ends"""
+        if self.state == 'open':
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = 'half_open'
+            return True
+        return self.state == 'closed'
+
+    def record_success(self):
+        self.state = 'closed'
+        self.failures = 0
+
+    def reopen(self):
+        """Go back to open after a probe that ended without a verdict, waiting another cool-down"""
+        self.state = 'open'
+        self.opened_at = time.monotonic()
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == 'half_open' or self.failures >= self.failure_threshold:
+            if self.state != 'open':
+                self.trips += 1
+            self.state = 'open'
+            self.opened_at = time.monotonic()
+
+    def stats(self):
+        """Breaker state for monitoring"""
+        retry_in = 0.0
+        if self.state == 'open':
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+        return {'state': self.state, 'failures': self.failures, 'trips': self.trips, 'retry_in': round(retry_in, 1)}
+
+def parse_retry_after(value, default=5.0):
+    """Seconds to wait from a Retry-After header given as seconds or an HTTP date"""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+class TokenBucket:
+    """Async token bucket for pacing outbound requests, with a global pause for Retry-After"""
+    def __init__(self, rate=GENIUS_RATE, burst=GENIUS_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = asyncio.Lock()
+        self.acquired = 0
+        self.throttled = 0
+        self.wait_time = 0.0
+        self.waiting = 0
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        """Wait until a request may be sent, taking one token"""
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            # The lock keeps waiters in arrival order
+            async with self.lock:
+                while True:
+                    now = time.monotonic()
+                    if now < self.paused_until:
+                        await asyncio.sleep(self.paused_until - now)
+                        continue
+                    
+                    self.refill(now)
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        break
+                    await asyncio.sleep((1 - self.tokens) / self.rate)
+        finally:
+            self.waiting -= 1
+        
+        self.acquired += 1
+        self.wait_time += time.monotonic() - started
+
+    def busy(self):
+        """Whether any request is queued for a token right now"""
+        return self.waiting > 0
+
+    def pause(self, seconds):
+        """Hold every request for seconds after a 429"""
+        self.throttled += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+    def stats(self):
+        """Requests let through, 429s seen and time spent waiting for a token"""
+        return {
+            'rate': self.rate,
+            'burst': self.burst,
+            'acquired': self.acquired,
+            'throttled': self.throttled,
+            'wait_seconds': round(self.wait_time, 3),
+            'avg_wait_seconds': round(self.wait_time / self.acquired, 3) if self.acquired else 0.0,
+            'paused_for': round(max(0.0, self.paused_until - time.monotonic()), 3)
+        }
+
+class LyricsStreamParser(HTMLParser):
+    """Incremental parser that picks lyrics and header metadata out of HTML as it arrives"""
+    artist_class = re.compile(r'HeaderArtist|artist_link|song_artist')
+    # Genius closes the lyrics section with a footer; seeing it means no more containers follow
+    footer_class = re.compile(r'LyricsFooter|Lyrics__Footer')
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = None
+        self.artist = None
+        self.album = None
+        self.capture = None
+        self.capture_tag = None
+        self.captured = []
+        self.lyrics_parts = []
+        self.lyrics_depth = 0
+        self.skip_depth = 0
+        self.current = []
+        self.chars_since_lyrics = 0
+        self.done = False
+
+    def feed(self, data):
+        super().feed(data)
+        if self.lyrics_parts and not self.lyrics_depth:
+            # No new container for a long stretch: the lyrics section is over
+            self.chars_since_lyrics += len(data)
+            if self.chars_since_lyrics > STREAM_GAP_CHARS:
+                self.done = True
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        attrs = dict(attrs)
+        
+        if self.lyrics_depth:
+            if tag == 'div':
+                self.lyrics_depth += 1
+            elif tag == 'br':
+                self.current.append('\n')
+            elif tag in ('script', 'style'):
+                self.skip_depth += 1
+            return
+        
+        css_class = attrs.get('class') or ''
+        if tag == 'div' and attrs.get('data-lyrics-container') == 'true':
+            self.lyrics_depth = 1
+            self.current = []
+        elif tag == 'div' and self.lyrics_parts and self.footer_class.search(css_class):
+            self.done = True
+        elif tag == 'h1' and self.title is None and not self.capture:
+            self.start_capture('title', tag)
+        elif tag == 'a' and not self.capture:
+            href = attrs.get('href') or ''
+            if self.artist is None and ('/artists/' in href or self.artist_class.search(css_class)):
+                self.start_capture('artist', tag)
+            elif self.album is None and '/albums/' in href:
+                self.start_capture('album', tag)
+
+    def handle_endtag(self, tag):
+        if self.lyrics_depth:
+            if tag in ('script', 'style') and self.skip_depth:
+                self.skip_depth -= 1
+            elif tag == 'div':
+                self.lyrics_depth -= 1
+                if not self.lyrics_depth:
+                    text = ''.join(self.current).strip()
+                    if text:
+                        self.lyrics_parts.append(text)
+                    self.chars_since_lyrics = 0
+        elif self.capture and tag == self.capture_tag:
+            setattr(self, self.capture, ''.join(self.captured).strip() or None)
+            self.capture = None
+
+    def handle_data(self, data):
+        if self.lyrics_depth:
+            if not self.skip_depth:
+                self.current.append(data)
+        elif self.capture:
+            self.captured.append(data)
+
+    def start_capture(self, field, tag):
+        self.capture = field
+        self.capture_tag = tag
+        self.captured = []
+
+    def page(self, song_url):
+        """The SongPage read so far"""
+        lyrics = re.sub(r'\n\s*\n', '\n\n', '\n'.join(self.lyrics_parts)) if self.lyrics_parts else None
+        return SongPage(song_url, lyrics=lyrics, title=self.title, artist=self.artist, album=self.album)
+
+async def read_text(response):
+    return await response.text()
+
+async def read_json(response):
+    return await response.json(content_type=None)
+
+class ParsePool:
+    """Runs BeautifulSoup parsing on a worker pool so the event loop only does I/O"""
+    def __init__(self, workers=PARSE_WORKERS, kind=PARSE_POOL_KIND):
+        self.workers = workers
+        self.kind = kind
+        if kind == 'process':
+            self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        else:
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='parse')
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+
+    async def run(self, func, *args):
+        """Run func(*args) on the pool and await its result"""
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        try:
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    async def run_stateful(self, func, *args):
+        """Like run, for calls that mutate an object in this process, which a process pool would only see a copy of"""
+        if self.kind == 'process':
+            return await asyncio.to_thread(func, *args)
+        return await self.run(func, *args)
+
+    def stats(self):
+        """Queue depth is the number of jobs waiting for a free worker"""
+        return {
+            'kind': self.kind,
+            'workers': self.workers,
+            'running': min(self.pending, self.workers),
+            'queue_depth': max(0, self.pending - self.workers),
+            'peak_pending': self.peak_pending,
+            'completed': self.completed
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
 class GeniusScraper:
     def __init__(self):
         self.base_url = "https://genius.com"
         self.search_url = "https://genius.com/search"
-        self.headerszz = {
+        self.search_api_url = "https://genius.com/api/search/multi"
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36 Brave/131.0.0.0',
             'Accept-Language': 'en-US,en;q=0.9',
         }
         self.session = None
+        # Search results keyed on normalized query, parsed pages keyed on song URL
+        self.search_cache = TTLCache(soft_ttl=CACHE_SOFT_TTL_SECONDS)
+        self.page_cache = TTLCache(soft_ttl=CACHE_SOFT_TTL_SECONDS)
+        # Failed lookups keyed like the caches above, valued 'not_found' or 'unavailable'
+        self.negative_cache = TTLCache(ttl=NEGATIVE_TTL_SECONDS)
+        # Every song the bot has resolved, for answering queries without a network search
+        self.index = SongIndex()
+        # Display names of those songs, for slash command autocomplete
+        self.suggestions = SongSuggestions()
+        # Persistent store consulted before the network; writes happen in the background
+        self.store = LyricsStore(LYRICS_DB_PATH) if LYRICS_DB_PATH else None
+        self.pending_writes = set()
+        # Lookups currently running, so concurrent identical requests share one result
+        self.in_flight = {}
+        # Background refreshes of stale entries, bounded so they never compete with users
+        self.refresh_slots = asyncio.Semaphore(REFRESH_CONCURRENCY)
+        self.refreshing = set()
+        self.refresh_tasks = set()
+        self.parser = ParsePool()
+        self.limiter = TokenBucket()
+        self.breaker = CircuitBreaker()
+        # Streaming fetch counters: pages read, pages cut short and bytes downloaded
+        self.streamed_pages = 0
+        self.stream_early_stops = 0
+        self.streamed_bytes = 0
 
     async def create_session(self):
-        if not self.session:
-            self.session = aiohttp.ClientSession(headers=self.headers)
+        if not self.session or self.session.closed:
+            self.session = create_http_session(self.headers)
 
     async def close_session(self):
         if self.session:
             await self.session.close()
+        if self.pending_writes:
+            await asyncio.gather(*self.pending_writes, return_exceptions=True)
 
-    async def search_song(self, query):
-        """Search for a song on Genius with improved selectors"""
-        await self.create_session()
+    def store_in_background(self, method, *args):
+        """Run a LyricsStore write on a worker thread without blocking the caller"""
+        if not self.store:
+            return
+        
+        task = asyncio.create_task(asyncio.to_thread(getattr(self.store, method), *args))
+        self.pending_writes.add(task)
+        task.add_done_callback(self.finish_write)
+
+    def finish_write(self, task):
+        self.pending_writes.discard(task)
+        if not task.cancelled() and task.exception():
+            print(f"Lyrics store write error: {task.exception()}")
+
+    async def load_from_store(self, method, *args):
+        """Run a LyricsStore read on a worker thread, treating errors as misses"""
+        if not self.store:
+            return None
         
         try:
-            params = {'q': query}
-            async with self.session.get(self.search_url, params=params) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    
-                    # Try multiple selector patterns
-                    patterns = [
-                        ('a', {'class': 'mini_card'}),
-                        ('a', {'href': re.compile(r'/.*-lyrics$')}),
-                        ('div', {'class': 'search_result'}),
-                        ('a', {'class': 'song_link'})
-                    ]
-                    
-                    for tag, attrs in patterns:
-                        search_results = soup.find_all(tag, attrs)
-                        if search_results:
-                            for result in search_results:
-                                href = result.get('href')
-                                if href and href.startswith('/'):
-                                    return self.base_url + href
-                    
-                    # If no results found with patterns, try fallback
-                    all_links = soup.find_all('a', href=True)
-                    for link in all_links:
-                        if '-lyrics' in link['href']:
-                            return self.base_url + link['href']
-                            
+            return await asyncio.to_thread(getattr(self.store, method), *args)
         except Exception as e:
-            print(f"Search error: {e}")
+            print(f"Lyrics store read error: {e}")
             return None
+
+    def cache_stats(self):
+        """Hit/miss counters for every scraper cache, for monitoring"""
+        return {
+            'search': self.search_cache.stats(),
+            'pages': self.page_cache.stats(),
+            'negative': self.negative_cache.stats()
+        }
+
+    def parser_stats(self):
+        """Worker pool size and queue depth of the parse stage"""
+        return self.parser.stats()
+
+    def limiter_stats(self):
+        """Outbound rate limiter counters and time spent waiting"""
+        return self.limiter.stats()
+
+    def breaker_stats(self):
+        """Circuit breaker state for monitoring"""
+        return self.breaker.stats()
+
+    async def request(self, url, params=None, reader=read_text):
+        """Rate-limited GET returning the body, None for a 404, or raising GeniusUnavailable"""
+        if not self.breaker.allow():
+            raise GeniusUnavailable("Genius looks down, not sending requests for a while")
         
-        return None
+        probe = self.breaker.state == 'half_open'
+        try:
+            await self.create_session()
+            try:
+                for attempt in range(RATE_LIMIT_RETRIES + 1):
+                    status, body = await self.send(url, params, reader)
+                    if status in (200, 404):
+                        # Only a 404 (body None) means the page really doesn't exist
+                        self.breaker.record_success()
+                        return body
+                    if status != 429:
+                        # A 403 block page or other refusal is Genius being unavailable, not "no such song"
+                        self.breaker.record_failure()
+                        raise GeniusUnavailable(f"Genius refused the request (HTTP {status})")
+            except TRANSIENT_ERRORS as e:
+                # Running out of command budget says nothing about Genius's health
+                if remaining_time(default=1.0) > 0:
+                    self.breaker.record_failure()
+                raise GeniusUnavailable(f"Genius is not responding ({type(e).__name__}: {e})") from e
+            
+            raise GeniusUnavailable("Genius is rate limiting the bot right now")
+        finally:
+            # A probe cut short by 429s, the deadline, a bad body or cancellation must not leave it half open
+            if probe and self.breaker.state == 'half_open':
+                self.breaker.reopen()
 
-    async def get_song_lyrics(self, song_url):
-        """Extract lyrics with improved parsing"""
-        await self.create_session()
+    @backoff.on_exception(
+        backoff.expo,
+        TRANSIENT_ERRORS,
+        max_tries=RETRY_MAX_TRIES,
+        max_value=RETRY_MAX_DELAY,
+        jitter=backoff.full_jitter
+    )
+    async def send(self, url, params, reader):
+        """One paced attempt, returning (status, body); transient failures are retried with jittered backoff"""
+        await self.limiter.acquire()
+        # Never let one attempt outlive the command that asked for it
+        remaining = remaining_time(default=ATTEMPT_TIMEOUT)
+        if remaining <= 0:
+            raise DeadlineExceeded("No time left to contact Genius")
+        timeout = aiohttp.ClientTimeout(
+            total=min(ATTEMPT_TIMEOUT, remaining),
+            connect=HTTP_CONNECT_TIMEOUT,
+            sock_read=HTTP_READ_TIMEOUT
+        )
+        async with self.session.get(url, params=params, timeout=timeout) as response:
+            if response.status == 429:
+                # Back off everyone, not just this request, then try again
+                self.limiter.pause(parse_retry_after(response.headers.get('Retry-After')))
+                return response.status, None
+            if response.status >= 500:
+                raise GeniusServerError(f"HTTP {response.status}")
+            if response.status == 200:
+                return response.status, await reader(response)
+            return response.status, None
+
+    async def fetch_html(self, url, params=None):
+        """Download a Genius page, returning its HTML or None"""
+        return await self.request(url, params=params)
+
+    async def fetch_json(self, url, params=None):
+        """Call a Genius JSON endpoint, returning the decoded body or None"""
+        return await self.request(url, params=params, reader=read_json)
+
+    def check_negative(self, key):
+        """True if key recently had no result; re-raises a recently cached outage"""
+        failure = self.negative_cache.get(key)
+        if failure == 'unavailable':
+            raise GeniusUnavailable("Genius was unavailable moments ago, not retrying yet")
+        return failure == 'not_found'
+
+    def remember_failure(self, key, failure):
+        ttl = ERROR_TTL_SECONDS if failure == 'unavailable' else NEGATIVE_TTL_SECONDS
+        self.negative_cache.set(key, failure, ttl=ttl)
+
+    async def coalesce(self, key, factory):
+        """Run factory() once per key, letting concurrent callers await the same task"""
+        entry = self.in_flight.get(key)
+        if entry is None:
+            # The task runs under the latest deadline of the callers waiting on it, not the first caller's
+            shared = SharedDeadline()
+            context = contextvars.Context()
+            context.run(current_deadline.set, shared)
+            task = asyncio.create_task(factory(), context=context)
+            entry = self.in_flight[key] = (task, shared)
+            task.add_done_callback(lambda done: self.forget_in_flight(key, done))
         
+        task, shared = entry
+        deadline = current_deadline.get()
+        shared.join(deadline)
         try:
-            async with self.session.get(song_url) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    
-                    # Try multiple lyric container patterns
-                    patterns = [
-                        {'data-lyrics-container': 'true'},
-                        {'class': re.compile(r'lyrics|Lyrics__Container')},
-                        {'class': 'lyrics'},
-                        {'class': 'song_body-lyrics'}
-                    ]
-                    
-                    for pattern in patterns:
-                        lyrics_div = soup.find('div', pattern)
-                        if lyrics_div:
-                            # Remove unwanted elements
-                            for br in lyrics_div.find_all('br'):
-                                br.replace_with('\n')
-                            for script in lyrics_div.find_all('script'):
-                                script.decompose()
-                            
-                            lyrics = lyrics_div.get_text(separator='\n').strip()
-                            lyrics = re.sub(r'\n\s*\n', '\n\n', lyrics)
-                            return lyrics
-                    
-                    # Fallback: look for any div containing "lyrics" in class
-                    for div in soup.find_all('div', class_=re.compile('lyrics', re.I)):
-                        lyrics = div.get_text(separator='\n').strip()
-                        if lyrics and len(lyrics) > 50:  # Ensure we have substantial content
-                            return re.sub(r'\n\s*\n', '\n\n', lyrics)
-                            
+            # Shield so one cancelled caller doesn't cancel the lookup for everyone else
+            return await asyncio.shield(task)
+        finally:
+            shared.leave(deadline)
+            # Nobody left who could use the answer; later callers start afresh
+            if not shared.waiting() and not task.done():
+                task.cancel()
+                self.forget_in_flight(key, task)
+
+    def forget_in_flight(self, key, task):
+        entry = self.in_flight.get(key)
+        if entry and entry[0] is task:
+            del self.in_flight[key]
+
+    async def search_song(self, query):
+        """Search for a song on Genius, serving repeat queries from the cache"""
+        query = query.strip()
+        if not query:
+            return None
+        # Queries that are all punctuation or noise words still get a key of their own
+        key = normalize_query(query) or query.casefold()
+        
+        song_url = self.search_cache.get(key)
+        if song_url:
+            if self.search_cache.is_stale(key):
+                self.refresh_in_background(('search', key), lambda: self.refresh_search(query, key))
+            return song_url
+        if self.check_negative(('search', key)):
+            return None
+        
+        song_url = self.index.resolve(query)
+        if song_url:
+            self.search_cache.set(key, song_url)
+            return song_url
+        
+        # The key only decides what counts as the same song; Genius is searched with what the user typed,
+        # since normalizing drops symbols that matter there ("P!nk", "AC/DC")
+        return await self.coalesce(('search', key), lambda: self.resolve_search(query, key))
+
+    async def resolve_search(self, query, key):
+        """Resolve a query through the persistent store, then the network"""
+        row = await self.load_from_store('load_url', key)
+        if row:
+            song_url, fetched_at = row
+            self.search_cache.set(key, song_url, age=time.time() - fetched_at)
+            return song_url
+        
+        try:
+            song_url = await self.fetch_search(query)
+        except GeniusUnavailable:
+            # Serve an expired answer rather than nothing while Genius is down
+            song_url = self.search_cache.get_stale(key)
+            if song_url:
+                return song_url
+            self.remember_failure(('search', key), 'unavailable')
+            raise
+        
+        if song_url:
+            self.search_cache.set(key, song_url)
+            self.index.add(query, song_url)
+            self.store_in_background('save_url', key, song_url)
+        else:
+            self.remember_failure(('search', key), 'not_found')
+        return song_url
+
+    async def search_hits(self, query):
+        """Ranked song results for query from the Genius JSON search API"""
+        try:
+            payload = await self.fetch_json(self.search_api_url, params={'q': query})
+            if payload:
+                return rank_search_hits(payload, query)
+        except GeniusUnavailable:
+            raise
         except Exception as e:
-            print(f"Lyrics extraction error: {e}")
+            print(f"Search API error: {e}")
         
-        return None
+        return []
 
-    async def get_song_info(self, song_url):
-        """Improved song info extraction"""
-        await self.create_session()
+    async def fetch_search(self, query):
+        """Search for a song on Genius, preferring the JSON API over the HTML results page"""
+        if SEARCH_BACKEND == 'api':
+            hits = await self.search_hits(query)
+            if hits and hits[0].score > 0:
+                return hits[0].url
         
+        return await self.fetch_search_page(query)
+
+    async def fetch_search_page(self, query):
+        """Scrape the HTML search page, parsing the results off the event loop"""
         try:
-            async with self.session.get(song_url) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    
-                    # Title extraction with multiple patterns
-                    title = None
-                    title_patterns = [
-                        ('h1', {'class': re.compile(r'SongHeader|song_header')}),
-                        ('h1', {'class': 'header_with_cover_art-primary_info-title'}),
-                        ('h1', {'class': 'song_title'}),
-                        ('h1', None)
-                    ]
-                    
-                    for tag, attrs in title_patterns:
-                        title_elem = soup.find(tag, attrs)
-                        if title_elem:
-                            title = title_elem.get_text().strip()
-                            break
-                    
-                    # Artist extraction
-                    artist = None
-                    artist_patterns = [
-                        ('a', {'class': re.compile(r'HeaderArtist|artist_link')}),
-                        ('a', {'href': re.compile(r'/artists/')}),
-                        ('span', {'class': 'song_artist'}),
-                        ('a', {'class': 'song_artist'})
-                    ]
-                    
-                    for tag, attrs in artist_patterns:
-                        artist_elem = soup.find(tag, attrs)
-                        if artist_elem:
-                            artist = artist_elem.get_text().strip()
-                            break
-                    
-                    # Album extraction
-                    album = None
-                    album_elem = soup.find('a', href=re.compile(r'/albums/'))
-                    if album_elem:
-                        album = album_elem.get_text().strip()
-                    
-                    return {
-                        'title': title or "Unknown Title",
-                        'artist': artist or "Unknown Artist",
-                        'album': album or "Unknown Album",
-                        'url': song_url
-                    }
-                    
+            html = await self.fetch_html(self.search_url, params={'q': query})
+            if html:
+                return await self.parser.run(parse_search_results, html, self.base_url)
+        except GeniusUnavailable:
+            raise
         except Exception as e:
-            print(f"Song info extraction error: {e}")
+            print(f"Search error: {e}")
         
         return None
 
-    async def get_song_lyrics(self, song_url):
-        """Extract lyrics from a Genius song page"""
-        await self.create_session()
+    async def get_song_page(self, song_url):
+        """Return the parsed song page, fetching it only on a cache miss"""
+        page = self.page_cache.get(song_url)
+        if page:
+            if self.page_cache.is_stale(song_url):
+                self.refresh_in_background(('page', song_url), lambda: self.refresh_song_page(song_url))
+            return page
+        if self.check_negative(('page', song_url)):
+            return None
+        
+        return await self.coalesce(('page', song_url), lambda: self.resolve_song_page(song_url))
+
+    async def resolve_song_page(self, song_url):
+        """Load a song page from the persistent store, then the network"""
+        page = await self.load_from_store('load_page', song_url)
+        if page:
+            self.page_cache.set(song_url, page, age=time.time() - page.fetched_at)
+            return page
         
         try:
-            async with self.session.get(song_url) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    
-                    # Find lyrics container
-                    lyrics_div = soup.find('div', {'data-lyrics-container': 'true'})
-                    if not lyrics_div:
-                        lyrics_div = soup.find('div', class_=re.compile(r'lyrics|Lyrics'))
-                    
-                    if lyrics_div:
-                        # Clean up the lyrics
-                        lyrics = lyrics_div.get_text(separator='\n').strip()
-                        # Remove extra whitespace and clean up
-                        lyrics = re.sub(r'\n\s*\n', '\n\n', lyrics)
-                        return lyrics
-                        
+            page = await self.fetch_song_page(song_url)
+        except GeniusUnavailable:
+            page = self.page_cache.get_stale(song_url)
+            if page:
+                return page
+            self.remember_failure(('page', song_url), 'unavailable')
+            raise
+        
+        if not page:
+            self.remember_failure(('page', song_url), 'not_found')
+        elif not page.lyrics:
+            # Metadata is still useful to /track, but retry the lyrics extraction soon
+            self.page_cache.set(song_url, page, ttl=NEGATIVE_TTL_SECONDS)
+        else:
+            self.page_cache.set(song_url, page)
+            self.index_page(page)
+            self.store_in_background('save_page', page)
+        return page
+
+    def index_page(self, page):
+        if page.title:
+            self.index_song(page.title, page.artist, page.url)
+
+    def index_song(self, title, artist, url):
+        # Users often type just the title, so index it on its own as well
+        self.index.add(f"{title} - {artist or ''}", url)
+        self.index.add(title, url)
+        self.suggestions.add(f"{title} - {artist}" if artist else title)
+
+    async def load_index(self):
+        """Rebuild the song indexes from everything in the persistent store"""
+        songs, queries = await self.load_from_store('load_index_entries') or ([], [])
+        for query, url in queries:
+            self.index.add(query, url)
+        for title, artist, url in songs:
+            self.index_song(title, artist, url)
+        print(f"Song index loaded: {self.index.stats()['aliases']} names")
+
+    def refresh_in_background(self, key, factory):
+        """Start a refresh of a stale entry unless one is already queued for key"""
+        if key in self.refreshing:
+            return
+        
+        self.refreshing.add(key)
+        # A fresh context, so the refresh isn't held to the deadline of the command that noticed it
+        task = asyncio.create_task(self.run_refresh(key, factory), context=contextvars.Context())
+        self.refresh_tasks.add(task)
+        task.add_done_callback(self.refresh_tasks.discard)
+
+    async def run_refresh(self, key, factory):
+        try:
+            # Spread refreshes out so a burst of stale hits doesn't become a burst of requests
+            await asyncio.sleep(random.uniform(0, REFRESH_JITTER_SECONDS))
+            async with self.refresh_slots:
+                await factory()
+        except Exception as e:
+            print(f"Background refresh error for {key}: {e}")
+        finally:
+            self.refreshing.discard(key)
+
+    async def refresh_search(self, query, key):
+        """Re-resolve a query, keeping the current answer if Genius has nothing better"""
+        song_url = await self.fetch_search(query)
+        if song_url:
+            self.search_cache.set(key, song_url)
+            self.index.add(query, song_url)
+            self.store_in_background('save_url', key, song_url)
+
+    async def refresh_song_page(self, song_url):
+        """Re-fetch a song page, replacing the cached copy only with one that has lyrics"""
+        page = await self.fetch_song_page(song_url)
+        if page and page.lyrics:
+            self.page_cache.set(song_url, page)
+            self.index_page(page)
+            self.store_in_background('save_page', page)
+
+    async def prefetch(self, query, idle_poll=0.5):
+        """Resolve and cache lyrics for query at low priority, returning whether it worked"""
+        # Wait until no user request is queued at the rate limiter
+        while self.limiter.busy():
+            await asyncio.sleep(idle_poll)
+        
+        song_url = await self.search_song(query)
+        return bool(song_url and await self.get_song_page(song_url))
+
+    async def warm_up(self, queries, interval=WARMUP_INTERVAL_SECONDS):
+        """Resolve and cache lyrics for queries one at a time, yielding to interactive traffic"""
+        warmed = 0
+        for query in queries:
+            try:
+                if await self.prefetch(query):
+                    warmed += 1
+            except GeniusUnavailable:
+                # Genius is struggling; back off instead of adding to the load
+                await asyncio.sleep(BREAKER_RESET_SECONDS)
+            except Exception as e:
+                print(f"Warm-up error for '{query}': {e}")
+            await asyncio.sleep(interval)
+        
+        print(f"Cache warm-up finished: {warmed}/{len(queries)} songs ready")
+        return warmed
+
+    def stream_stats(self):
+        """How much the streaming fetch downloaded and how often it stopped early"""
+        return {'pages': self.streamed_pages, 'early_stops': self.stream_early_stops, 'bytes': self.streamed_bytes}
+
+    async def read_song_stream(self, response, song_url):
+        """Read a song page incrementally, returning a SongPage once the lyrics are complete or else the full HTML"""
+        stream = LyricsStreamParser()
+        decoder = codecs.getincrementaldecoder(response.charset or 'utf-8')(errors='replace')
+        parts = []
+        self.streamed_pages += 1
+        
+        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+            self.streamed_bytes += len(chunk)
+            text = decoder.decode(chunk)
+            parts.append(text)
+            # HTMLParser is pure Python, so keep it off the event loop like every other parse
+            await self.parser.run_stateful(stream.feed, text)
+            if stream.done:
+                # Leaving the response unread closes the connection and stops the download
+                self.stream_early_stops += 1
+                return stream.page(song_url)
+        
+        parts.append(decoder.decode(b'', final=True))
+        return ''.join(parts)
+
+    async def fetch_song_page(self, song_url):
+        """Fetch and parse a song page once, yielding lyrics and metadata together"""
+        try:
+            if STREAM_FETCH:
+                body = await self.request(song_url, reader=lambda response: self.read_song_stream(response, song_url))
+                if isinstance(body, SongPage):
+                    return body
+            else:
+                body = await self.fetch_html(song_url)
+            if body:
+                return await self.parser.run(parse_song_page, body, song_url)
+        except GeniusUnavailable:
+            raise
         except Exception as e:
-            print(f"Lyrics extraction error: {e}")
+            print(f"Song page extraction error: {e}")
         
         return None
 
+    async def get_song_lyrics(self, song_url):
+        """Extract lyrics from a Genius song page"""
+        page = await self.get_song_page(song_url)
+        return page.lyrics if page else None
+
     async def get_song_info(self, song_url):
         """Extract song information from Genius page"""
-        await self.create_session()
+        page = await self.get_song_page(song_url)
+        return page.info() if page else None
+
+class AsyncGenius:
+    """Non-blocking counterpart of lyricsgenius.Genius built on the scraper's aiohttp session"""
+    # lyricsgenius uses a blocking requests.Session and time.sleep, which would freeze every guild
+    public_api_root = "https://genius.com/api/"
+    web_root = "https://genius.com/"
+
+    def __init__(self, scraper, remove_section_headers=False, skip_non_songs=True):
+        self.scraper = scraper
+        self.remove_section_headers = remove_section_headers
+        self.skip_non_songs = skip_non_songs
+
+    async def make_request(self, path, params=None, web=False):
+        """Request a public API path (decoded JSON response) or a web page (HTML)"""
+        # Paced by the scraper's shared token bucket, which stands in for lyricsgenius' sleep_time
+        if web:
+            return await self.scraper.fetch_html(self.web_root + path, params=params)
+        
+        res = await self.scraper.fetch_json(self.public_api_root + path, params=params)
+        return res.get('response', res) if res else None
+
+    async def search_all(self, search_term, per_page=None, page=None):
+        params = {'q': search_term}
+        if per_page:
+            params['per_page'] = per_page
+        if page:
+            params['page'] = page
+        return await self.make_request('search/multi', params=params)
+
+    async def song(self, song_id):
+        return await self.make_request(f'songs/{song_id}')
+
+    async def lyrics(self, song_id=None, song_url=None, remove_section_headers=False):
+        """Scrape a song's lyrics by ID or URL, like lyricsgenius.Genius.lyrics"""
+        if not song_id and not song_url:
+            raise ValueError("You must supply either `song_id` or `song_url`.")
+        
+        if not song_url:
+            res = await self.song(song_id)
+            if not res:
+                return None
+            song_url = res['song']['url']
+        
+        page = await self.scraper.get_song_page(song_url)
+        if not page or not page.lyrics:
+            return None
+        
+        lyrics = page.lyrics
+        # Remove [Verse], [Bridge], etc.
+        if self.remove_section_headers or remove_section_headers:
+            lyrics = re.sub(r'(\[.*?\])*', '', lyrics)
+            lyrics = re.sub('\n{2}', '\n', lyrics)
+        return lyrics.strip('\n')
+
+    async def search_song(self, title=None, artist="", song_id=None, get_full_info=True):
+        """Find a song by title/artist or ID and return it as a SongPage with lyrics"""
+        if title is None and song_id is None:
+            raise ValueError("You must pass either a `title` or a `song_id`.")
+        
+        if song_id:
+            res = await self.song(song_id)
+            song_info = res['song'] if res else None
+        else:
+            search_term = f"{title} {artist}".strip()
+            payload = await self.search_all(search_term)
+            hits = rank_search_hits({'response': payload}, search_term) if payload else []
+            song_info = None
+            if hits:
+                song_info = {'id': hits[0].song_id, 'url': hits[0].url, 'title': hits[0].title, 'artist_names': hits[0].artist}
+                if self.skip_non_songs and hits[0].score < 0:
+                    return None
+                if get_full_info and hits[0].song_id:
+                    res = await self.song(hits[0].song_id)
+                    if res:
+                        song_info.update(res['song'])
+        
+        if not song_info:
+            return None
+        
+        lyrics = await self.lyrics(song_url=song_info['url'])
+        if self.skip_non_songs and not lyrics:
+            return None
+        
+        album = song_info.get('album') or {}
+        return SongPage(
+            song_info['url'],
+            lyrics=lyrics,
+            title=song_info.get('title'),
+            artist=song_info.get('artist_names') or (song_info.get('primary_artist') or {}).get('name'),
+            album=album.get('name') if isinstance(album, dict) else None
+        )
+
+class Prefetcher:
+    """Bounded background queue that caches lyrics for songs before anyone asks for them"""
+    def __init__(self, scraper, max_queued=PREFETCH_QUEUE_SIZE, workers=PREFETCH_WORKERS):
+        self.scraper = scraper
+        self.queue = asyncio.Queue(maxsize=max_queued)
+        self.queued = set()
+        self.worker_count = workers
+        self.workers = []
+        self.completed = 0
+        self.dropped = 0
+
+    def enqueue(self, query):
+        """Queue query for prefetching; dropped when already queued or the queue is full"""
+        key = normalize_query(query)
+        if key in self.queued:
+            return False
         
         try:
-            async with self.session.get(song_url) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    
-                    # Extract song title
-                    title_elem = soup.find('h1', class_=re.compile(r'SongHeader'))
-                    if not title_elem:
-                        title_elem = soup.find('h1')
-                    title = title_elem.get_text().strip() if title_elem else "Unknown Title"
-                    
-                    # Extract artist
-                    artist_elem = soup.find('a', class_=re.compile(r'HeaderArtistAndTracklistdesktop'))
-                    if not artist_elem:
-                        artist_elem = soup.find('a', href=re.compile(r'/artists/'))
-                    artist = artist_elem.get_text().strip() if artist_elem else "Unknown Artist"
-                    
-                    # Extract album info
-                    album_elem = soup.find('a', href=re.compile(r'/albums/'))
-                    album = album_elem.get_text().strip() if album_elem else "Unknown Album"
-                    
-                    return {
-                        'title': title,
-                        'artist': artist,
-                        'album': album,
-                        'url': song_url
-                    }
-                    
-        except Exception as e:
-            print(f"Song info extraction error: {e}")
+            self.queue.put_nowait(query)
+        except asyncio.QueueFull:
+            # A big bulk add shouldn't grow without bound; these will just be fetched on demand
+            self.dropped += 1
+            return False
         
-        return None
+        self.queued.add(key)
+        if not self.workers:
+            self.workers = [asyncio.create_task(self.worker()) for _ in range(self.worker_count)]
+        return True
+
+    async def worker(self):
+        while True:
+            query = await self.queue.get()
+            try:
+                await self.scraper.prefetch(query)
+                self.completed += 1
+            except GeniusUnavailable:
+                await asyncio.sleep(BREAKER_RESET_SECONDS)
+            except Exception as e:
+                print(f"Prefetch error for '{query}': {e}")
+            finally:
+                self.queued.discard(normalize_query(query))
+                self.queue.task_done()
+
+    def stats(self):
+        return {'queued': self.queue.qsize(), 'completed': self.completed, 'dropped': self.dropped}
 
 # Initialize scraper
 scraper = GeniusScraper()
+genius = AsyncGenius(scraper)
+prefetcher = Prefetcher(scraper)
 
 # In-memory playlist storage (in production, use a database)
 playlists = {}
 
+# Simple genre-based recommendations (you can expand this)
+GENRE_RECOMMENDATIONS = {
+    'pop': ['Shape of You - Ed Sheeran', 'Blinding Lights - The Weeknd', 'Watermelon Sugar - Harry Styles', 'Levitating - Dua Lipa', 'Good 4 U - Olivia Rodrigo'],
+    'rock': ['Bohemian Rhapsody - Queen', 'Sweet Child O Mine - Guns N Roses', 'Hotel California - Eagles', 'Stairway to Heaven - Led Zeppelin', 'Smells Like Teen Spirit - Nirvana'],
+    'hip-hop': ['God\'s Plan - Drake', 'HUMBLE. - Kendrick Lamar', 'Sicko Mode - Travis Scott', 'Old Town Road - Lil Nas X', 'Rockstar - Post Malone'],
+    'r&b': ['Blinding Lights - The Weeknd', 'Peaches - Justin Bieber', 'Levitating - Dua Lipa', 'Good Days - SZA', 'Leave The Door Open - Bruno Mars'],
+    'country': ['The Good Ones - Gabby Barrett', 'More Than My Hometown - Morgan Wallen', 'Heartbreak Hotel - Chris Young', 'Life Changes - Thomas Rhett', 'Star Spangled Banner - Chris Stapleton']
+}
+
+MOOD_SONGS = {
+    'happy': ['Happy - Pharrell Williams', 'Good as Hell - Lizzo', 'Shake It Off - Taylor Swift', 'Uptown Funk - Bruno Mars', 'Can\'t Stop the Feeling - Justin Timberlake'],
+    'sad': ['Someone Like You - Adele', 'Hurt - Johnny Cash', 'Mad World - Gary Jules', 'Black - Pearl Jam', 'Tears in Heaven - Eric Clapton'],
+    'energetic': ['Thunder - Imagine Dragons', 'Pump It - Black Eyed Peas', 'Eye of the Tiger - Survivor', 'Don\'t Stop Me Now - Queen', 'Confident - Demi Lovato'],
+    'chill': ['Stay - Rihanna', 'Summertime - DJ Jazzy Jeff', 'Sunday Morning - Maroon 5', 'Come Away With Me - Norah Jones', 'Breathe Me - Sia'],
+    'romantic': ['Perfect - Ed Sheeran', 'All of Me - John Legend', 'Thinking Out Loud - Ed Sheeran', 'A Thousand Years - Christina Perri', 'Make You Feel My Love - Adele']
+}
+
+def catalog_songs():
+    """Every distinct song listed by /recommend and /mood, in catalog order"""
+    songs = []
+    for catalog in (GENRE_RECOMMENDATIONS, MOOD_SONGS):
+        for catalog_list in catalog.values():
+            for song in catalog_list:
+                if song not in songs:
+                    songs.append(song)
+    return songs
+
+async def prepare_caches():
+    """Load the song index from disk, then warm the cache from the catalogs"""
+    for song in catalog_songs():
+        scraper.suggestions.add(song)
+    await scraper.load_index()
+    if WARMUP_ON_START:
+        await scraper.warm_up(catalog_songs())
+
+startup_task = None
+
 @bot.event
 async def on_ready():
+    global startup_task
     print(f'{bot.user} has connected to Discord!')
     print(f'Bot is ready to serve karaoke!')
+    
+    # on_ready fires again after reconnects, so only prepare the caches once
+    if startup_task is None:
+        startup_task = asyncio.create_task(prepare_caches())
+        if SYNC_COMMANDS_ON_START:
+            await sync_commands()
+
+async def sync_commands():
+    """Register the slash versions of the commands with Discord"""
+    try:
+        synced = await bot.tree.sync()
+        print(f"Synced {len(synced)} slash commands")
+        return len(synced)
+    except discord.HTTPException as e:
+        print(f"Error syncing slash commands: {e}")
+        return None
+
+async def song_autocomplete(interaction, current):
+    """Suggest known song names as the user types; answered from memory within Discord's 3s budget"""
+    return [app_commands.Choice(name=name[:100], value=name[:100]) for name in scraper.suggestions.complete(current)]
+
+class OutboundMessage:
+    """A message waiting in a channel's send queue, resolved with the sent discord.Message"""
+    def __init__(self, destination, content, kwargs, coalesce):
+        self.destination = destination
+        self.content = content
+        self.kwargs = kwargs
+        self.coalesce = coalesce and not kwargs and content is not None
+        self.future = asyncio.get_running_loop().create_future()
+
+class ChannelOutbox:
+    """Per-channel send queues that pace, batch and prioritize the bot's messages"""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+    def __init__(self, rate=CHANNEL_SEND_RATE, burst=CHANNEL_SEND_BURST):
+        self.rate = rate
+        self.burst = burst
+        # channel id -> heap of (priority, seq, message), and the worker draining it with its own bucket
+        self.queues = {}
+        self.workers = {}
+        self.seq = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+    async def send(self, ctx, content=None, priority=INTERACTIVE, coalesce=True, **kwargs):
+        """Queue a message for ctx's channel and wait until it has been sent"""
+        # Interaction responses go through the interaction webhook, outside the channel's bucket
+        if getattr(ctx, 'interaction', None):
+            return await ctx.send(content, **kwargs)
+        
+        channel_id = ctx.channel.id
+        message = OutboundMessage(ctx, content, kwargs, coalesce)
+        queue = self.queues.setdefault(channel_id, [])
+        self.seq += 1
+        heapq.heappush(queue, (priority, self.seq, message))
+        self.max_depth = max(self.max_depth, len(queue))
+        if channel_id not in self.workers:
+            self.workers[channel_id] = asyncio.create_task(self.drain(channel_id))
+        return await message.future
+
+    def next_batch(self, queue):
+        """Pop the next message plus any small plain-text ones right behind it that fit alongside"""
+        priority, _, first = heapq.heappop(queue)
+        batch = [first]
+        size = discord_length(first.content) if first.coalesce else DISCORD_MESSAGE_LIMIT
+        while queue and queue[0][0] == priority and queue[0][2].coalesce:
+            extra = discord_length(queue[0][2].content) + 1
+            if size + extra > DISCORD_MESSAGE_LIMIT:
+                break
+            batch.append(heapq.heappop(queue)[2])
+            size += extra
+        return batch
+
+    async def drain(self, channel_id):
+        queue = self.queues[channel_id]
+        bucket = TokenBucket(self.rate, self.burst)
+        try:
+            while True:
+                while queue:
+                    await self.send_batch(self.next_batch(queue), bucket)
+                # Stay around until the bucket is full again, so a fresh worker can't exceed the budget,
+                # then let the channel's queue and bucket go
+                bucket.refill(time.monotonic())
+                if bucket.tokens >= bucket.burst:
+                    break
+                await asyncio.sleep((bucket.burst - bucket.tokens) / bucket.rate)
+        finally:
+            del self.workers[channel_id]
+            if not queue:
+                del self.queues[channel_id]
+
+    async def send_batch(self, batch, bucket):
+        first = batch[0]
+        await bucket.acquire()
+        try:
+            content = '\n'.join(message.content for message in batch) if len(batch) > 1 else first.content
+            sent = await first.destination.send(content, **first.kwargs)
+        except Exception as e:
+            for message in batch:
+                if not message.future.done():
+                    message.future.set_exception(e)
+            return
+        self.sent += 1
+        self.coalesced += len(batch) - 1
+        for message in batch:
+            if not message.future.done():
+                message.future.set_result(sent)
+
+    def stats(self):
+        """Queue depth per channel plus messages sent, folded together and the deepest queue seen"""
+        return {
+            'channels': len(self.queues),
+            'queued': sum(len(queue) for queue in self.queues.values()),
+            'depths': {channel_id: len(queue) for channel_id, queue in self.queues.items() if queue},
+            'max_depth': self.max_depth,
+            'sent': self.sent,
+            'coalesced': self.coalesced
+        }
+
+outbox = ChannelOutbox()
 
-@bot.command(name='lyrics')
+class StatusReply:
+    """One reply edited in place as a command progresses, instead of a new message per stage"""
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self.message = None
+
+    async def update(self, content=None, **kwargs):
+        if self.message is None:
+            # Edited later, so never folded into another message
+            self.message = await outbox.send(self.ctx, content, coalesce=False, **kwargs)
+        else:
+            await self.message.edit(content=content, **kwargs)
+
+class LyricsPaginator(discord.ui.View):
+    """Previous/next buttons that flip a single message through a song's lyric pages"""
+    def __init__(self, song_name, song, timeout=PAGINATOR_TIMEOUT):
+        super().__init__(timeout=timeout)
+        self.song_name = song_name
+        self.song = song
+        self.pages = song.lyric_page_list()
+        self.current = 0
+        self.message = None
+        self.update_buttons()
+
+    def render(self):
+        # Page sizes leave LYRICS_HEADER_RESERVE for this header, so the name is capped, in Discord's units, to fit
+        song_name = truncate_discord(self.song_name, SONG_NAME_DISPLAY_CHARS)
+        if len(self.pages) == 1:
+            header = f"🎤 **Lyrics for {song_name}:**\n"
+        else:
+            header = f"🎤 **Lyrics for {song_name}** ({self.current + 1}/{len(self.pages)}):\n"
+        # Never let a page, however it was sized, push the message past Discord's limit
+        budget = DISCORD_MESSAGE_LIMIT - discord_length(header) - CODE_FENCE_OVERHEAD
+        page = truncate_discord(self.pages[self.current], budget)
+        return f"{header}```\n{page}\n```"
+
+    def update_buttons(self):
+        self.previous_page.disabled = self.current == 0
+        self.next_page.disabled = self.current == len(self.pages) - 1
+
+    async def show(self, interaction, current):
+        self.current = current
+        self.update_buttons()
+        await interaction.response.edit_message(content=self.render(), view=self)
+
+    @discord.ui.button(label='◀ Previous', style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction, button):
+        await self.show(interaction, max(self.current - 1, 0))
+
+    @discord.ui.button(label='Next ▶', style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction, button):
+        await self.show(interaction, min(self.current + 1, len(self.pages) - 1))
+
+    @discord.ui.button(label='📄 Full lyrics as file', style=discord.ButtonStyle.primary)
+    async def send_file(self, interaction, button):
+        # Built from the cached bytes in memory and uploaded with the response itself, one API call
+        data = self.song.lyrics_file_bytes()
+        await interaction.response.send_message(file=discord.File(io.BytesIO(data), filename=self.song.lyrics_filename()))
+
+    async def on_timeout(self):
+        # Remove the dead buttons and drop references so the view can be collected
+        if self.message:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
+        self.message = None
+        self.song = None
+        self.pages = None
+
+@bot.hybrid_command(name='lyrics')
+@app_commands.autocomplete(song_name=song_autocomplete)
 async def get_lyrics(ctx, *, song_name):
     """Fetch and display song lyrics"""
     if not song_name:
-        await ctx.send("Please provide a song name! Usage: `/lyrics <song name>`")
+        await outbox.send(ctx, "Please provide a song name! Usage: `/lyrics <song name>`")
         return
     
-    await ctx.send(f"🎵 Searching for lyrics: **{song_name}**...")
+    # Acknowledge slash commands right away; every later stage edits the same reply
+    await ctx.defer()
+    status = StatusReply(ctx)
+    await status.update(f"🎵 Searching for lyrics: **{song_name}**...")
     
     try:
-        # Search for the song
-        song_url = await scraper.search_song(song_name)
+        # Search for the song and get its lyrics within one deadline
+        async with command_deadline():
+            song_url = await scraper.search_song(song_name)
+            if song_url and scraper.page_cache.get_stale(song_url) is None:
+                await status.update(f"🎶 Found **{song_name}**, fetching lyrics...")
+            song = await scraper.get_song_page(song_url) if song_url else None
+            pages = song.lyric_page_list() if song else None
+        
         if not song_url:
-            await ctx.send(f"❌ Couldn't find lyrics for '{song_name}'. Try a different search term!")
+            await status.update(f"❌ Couldn't find lyrics for '{song_name}'. Try a different search term!")
             return
         
-        # Get lyrics
-        lyrics = await scraper.get_song_lyrics(song_url)
-        if not lyrics:
-            await ctx.send(f"❌ Found the song but couldn't extract lyrics for '{song_name}'")
+        if not pages:
+            await status.update(f"❌ Found the song but couldn't extract lyrics for '{song_name}'")
             return
         
-        # Discord has a 2000 character limit, so we need to split long lyrics
-        if len(lyrics) > 1900:
-            # Split lyrics into chunks
-            chunks = [lyrics[i:i+1900] for i in range(0, len(lyrics), 1900)]
-            await ctx.send(f"🎤 **Lyrics for {song_name}:**")
-            for i, chunk in enumerate(chunks):
-                if i < 3:  # Limit to 3 chunks to avoid spam
-                    await ctx.send(f"```\n{chunk}\n```")
-                else:
-                    await ctx.send("... (lyrics too long, showing first part only)")
-                    break
+        # One message for the whole song; longer lyrics get page buttons and a file download instead of extra messages
+        paginator = LyricsPaginator(song_name, song)
+        if len(pages) > 1:
+            await status.update(paginator.render(), view=paginator)
+            paginator.message = status.message
         else:
-            await ctx.send(f"🎤 **Lyrics for {song_name}:**\n```\n{lyrics}\n```")
+            await status.update(paginator.render())
             
+    except GeniusUnavailable:
+        await status.update("⏳ Genius is busy right now, please try again in a few seconds!")
+    except (TimeoutError, DeadlineExceeded):
+        await status.update(f"⌛ Fetching lyrics for '{song_name}' took too long, please try again!")
     except Exception as e:
-        await ctx.send(f"❌ An error occurred while fetching lyrics: {str(e)}")
+        await status.update(f"❌ An error occurred while fetching lyrics: {str(e)}")
 
-@bot.command(name='track')
+@bot.hybrid_command(name='track')
+@app_commands.autocomplete(song_name=song_autocomplete)
 async def get_track_info(ctx, *, song_name):
     """Get detailed track information"""
     if not song_name:
-        await ctx.send("Please provide a song or artist name! Usage: `/track <song name>`")
+        await outbox.send(ctx, "Please provide a song or artist name! Usage: `/track <song name>`")
         return
     
-    await ctx.send(f"🔍 Searching for track info: **{song_name}**...")
+    await ctx.defer()
+    status = StatusReply(ctx)
+    await status.update(f"🔍 Searching for track info: **{song_name}**...")
     
     try:
-        # Search for the song
-        song_url = await scraper.search_song(song_name)
+        # Search for the song and get its information within one deadline
+        async with command_deadline():
+            song_url = await scraper.search_song(song_name)
+            if song_url and scraper.page_cache.get_stale(song_url) is None:
+                await status.update(f"🎶 Found **{song_name}**, fetching track info...")
+            song_info = await scraper.get_song_info(song_url) if song_url else None
+        
         if not song_url:
-            await ctx.send(f"❌ Couldn't find track info for '{song_name}'")
+            await status.update(f"❌ Couldn't find track info for '{song_name}'")
             return
         
-        # Get song information
-        song_info = await scraper.get_song_info(song_url)
         if not song_info:
-            await ctx.send(f"❌ Found the song but couldn't extract info for '{song_name}'")
+            await status.update(f"❌ Found the song but couldn't extract info for '{song_name}'")
             return
         
         # Create an embed with the track info
@@ -318,26 +2041,23 @@ async def get_track_info(ctx, *, song_name):
         embed.add_field(name="Album", value=song_info['album'], inline=True)
         embed.add_field(name="Genius Link", value=f"[View on Genius]({song_info['url']})", inline=False)
         
-        await ctx.send(embed=embed)
+        await status.update(None, embed=embed)
         
+    except GeniusUnavailable:
+        await status.update("⏳ Genius is busy right now, please try again in a few seconds!")
+    except (TimeoutError, DeadlineExceeded):
+        await status.update(f"⌛ Fetching track info for '{song_name}' took too long, please try again!")
     except Exception as e:
-        await ctx.send(f"❌ An error occurred while fetching track info: {str(e)}")
+        await status.update(f"❌ An error occurred while fetching track info: {str(e)}")
 
 @bot.command(name='recommend')
 async def recommend_songs(ctx, genre=None):
     """Recommend popular songs by genre"""
     if not genre:
-        await ctx.send("Please specify a genre! Usage: `/recommend <genre>`\nExample: `/recommend pop`")
+        await outbox.send(ctx, "Please specify a genre! Usage: `/recommend <genre>`\nExample: `/recommend pop`")
         return
     
-    # Simple genre-based recommendations (you can expand this)
-    recommendations = {
-        'pop': ['Shape of You - Ed Sheeran', 'Blinding Lights - The Weeknd', 'Watermelon Sugar - Harry Styles', 'Levitating - Dua Lipa', 'Good 4 U - Olivia Rodrigo'],
-        'rock': ['Bohemian Rhapsody - Queen', 'Sweet Child O Mine - Guns N Roses', 'Hotel California - Eagles', 'Stairway to Heaven - Led Zeppelin', 'Smells Like Teen Spirit - Nirvana'],
-        'hip-hop': ['God\'s Plan - Drake', 'HUMBLE. - Kendrick Lamar', 'Sicko Mode - Travis Scott', 'Old Town Road - Lil Nas X', 'Rockstar - Post Malone'],
-        'r&b': ['Blinding Lights - The Weeknd', 'Peaches - Justin Bieber', 'Levitating - Dua Lipa', 'Good Days - SZA', 'Leave The Door Open - Bruno Mars'],
-        'country': ['The Good Ones - Gabby Barrett', 'More Than My Hometown - Morgan Wallen', 'Heartbreak Hotel - Chris Young', 'Life Changes - Thomas Rhett', 'Star Spangled Banner - Chris Stapleton']
-    }
+    recommendations = GENRE_RECOMMENDATIONS
     
     genre_lower = genre.lower()
     if genre_lower in recommendations:
@@ -348,25 +2068,19 @@ async def recommend_songs(ctx, genre=None):
             embed.add_field(name=f"{i}.", value=song, inline=False)
         
         embed.set_footer(text="Use /lyrics <song name> to get lyrics for any of these songs!")
-        await ctx.send(embed=embed)
+        await outbox.send(ctx, embed=embed)
     else:
         available_genres = ', '.join(recommendations.keys())
-        await ctx.send(f"❌ Genre '{genre}' not available. Try one of: {available_genres}")
+        await outbox.send(ctx, f"❌ Genre '{genre}' not available. Try one of: {available_genres}")
 
 @bot.command(name='mood')
 async def mood_songs(ctx, *, mood=None):
     """Get songs based on your current mood"""
     if not mood:
-        await ctx.send("Tell me your mood! Usage: `/mood <your mood>`\nExample: `/mood happy`, `/mood sad`, `/mood energetic`")
+        await outbox.send(ctx, "Tell me your mood! Usage: `/mood <your mood>`\nExample: `/mood happy`, `/mood sad`, `/mood energetic`")
         return
     
-    mood_songs = {
-        'happy': ['Happy - Pharrell Williams', 'Good as Hell - Lizzo', 'Shake It Off - Taylor Swift', 'Uptown Funk - Bruno Mars', 'Can\'t Stop the Feeling - Justin Timberlake'],
-        'sad': ['Someone Like You - Adele', 'Hurt - Johnny Cash', 'Mad World - Gary Jules', 'Black - Pearl Jam', 'Tears in Heaven - Eric Clapton'],
-        'energetic': ['Thunder - Imagine Dragons', 'Pump It - Black Eyed Peas', 'Eye of the Tiger - Survivor', 'Don\'t Stop Me Now - Queen', 'Confident - Demi Lovato'],
-        'chill': ['Stay - Rihanna', 'Summertime - DJ Jazzy Jeff', 'Sunday Morning - Maroon 5', 'Come Away With Me - Norah Jones', 'Breathe Me - Sia'],
-        'romantic': ['Perfect - Ed Sheeran', 'All of Me - John Legend', 'Thinking Out Loud - Ed Sheeran', 'A Thousand Years - Christina Perri', 'Make You Feel My Love - Adele']
-    }
+    mood_songs = MOOD_SONGS
     
     mood_lower = mood.lower()
     matching_moods = [m for m in mood_songs.keys() if mood_lower in m or m in mood_lower]
@@ -381,12 +2095,24 @@ async def mood_songs(ctx, *, mood=None):
             embed.add_field(name=f"{i}.", value=song, inline=False)
         
         embed.set_footer(text="Use /lyrics <song name> to get lyrics for any of these songs!")
-        await ctx.send(embed=embed)
+        await outbox.send(ctx, embed=embed)
     else:
         available_moods = ', '.join(mood_songs.keys())
-        await ctx.send(f"❌ I don't have songs for '{mood}' mood yet. Try one of: {available_moods}")
+        await outbox.send(ctx, f"❌ I don't have songs for '{mood}' mood yet. Try one of: {available_moods}")
 
-@bot.command(name='playlist')
+async def playlist_autocomplete(interaction, current):
+    """Suggest songs already queued when removing, known songs otherwise"""
+    if interaction.namespace.action == 'remove':
+        guild_id = interaction.guild_id or interaction.user.id
+        key = normalize_query(current)
+        names = [song for song in playlists.get(guild_id, []) if key in normalize_query(song)][:AUTOCOMPLETE_LIMIT]
+    else:
+        names = scraper.suggestions.complete(current)
+    return [app_commands.Choice(name=name[:100], value=name[:100]) for name in names]
+
+@bot.hybrid_command(name='playlist')
+@app_commands.autocomplete(song_name=playlist_autocomplete)
+@app_commands.choices(action=[app_commands.Choice(name=action, value=action) for action in ('add', 'remove', 'view', 'clear')])
 async def playlist_command(ctx, action=None, *, song_name=None):
     """Manage shared session playlist"""
     guild_id = ctx.guild.id if ctx.guild else ctx.author.id
@@ -396,30 +2122,44 @@ async def playlist_command(ctx, action=None, *, song_name=None):
     
     if action == 'add' and song_name:
         playlists[guild_id].append(song_name)
-        await ctx.send(f"✅ Added '{song_name}' to the playlist!")
+        await outbox.send(ctx, f"✅ Added '{song_name}' to the playlist!")
+        
+        # Have lyrics ready for the new song and the next few up
+        for upcoming in [song_name] + playlists[guild_id][:PREFETCH_AHEAD]:
+            prefetcher.enqueue(upcoming)
         
     elif action == 'remove' and song_name:
         if song_name in playlists[guild_id]:
             playlists[guild_id].remove(song_name)
-            await ctx.send(f"✅ Removed '{song_name}' from the playlist!")
+            await outbox.send(ctx, f"✅ Removed '{song_name}' from the playlist!")
         else:
-            await ctx.send(f"❌ '{song_name}' not found in the playlist!")
+            await outbox.send(ctx, f"❌ '{song_name}' not found in the playlist!")
             
     elif action == 'view' or action is None:
         if playlists[guild_id]:
             embed = discord.Embed(title="🎵 Current Playlist", color=0x3498DB)
             for i, song in enumerate(playlists[guild_id], 1):
                 embed.add_field(name=f"{i}.", value=song, inline=False)
-            await ctx.send(embed=embed)
+            await outbox.send(ctx, embed=embed)
         else:
-            await ctx.send("📭 Playlist is empty! Use `/playlist add <song name>` to add songs.")
+            await outbox.send(ctx, "📭 Playlist is empty! Use `/playlist add <song name>` to add songs.")
             
     elif action == 'clear':
         playlists[guild_id] = []
-        await ctx.send("🗑️ Playlist cleared!")
+        await outbox.send(ctx, "🗑️ Playlist cleared!")
         
     else:
-        await ctx.send("Usage: `/playlist [add/remove/view/clear] [song name]`\nExamples:\n`/playlist add Bohemian Rhapsody`\n`/playlist view`\n`/playlist remove Bohemian Rhapsody`")
+        await outbox.send(ctx, "Usage: `/playlist [add/remove/view/clear] [song name]`\nExamples:\n`/playlist add Bohemian Rhapsody`\n`/playlist view`\n`/playlist remove Bohemian Rhapsody`")
+
+@bot.command(name='sync')
+@commands.is_owner()
+async def sync_command(ctx):
+    """Register the slash commands with Discord after they change (bot owner only)"""
+    count = await sync_commands()
+    if count is None:
+        await outbox.send(ctx, "❌ Couldn't sync slash commands, try again later!")
+    else:
+        await outbox.send(ctx, f"✅ Synced {count} slash commands!")
 
 async def help_command(ctx):
     """Show all available commands"""
@@ -452,17 +2192,17 @@ async def help_command(ctx):
     )
     
     embed.set_footer(text="🎵 Happy singing! 🎵")
-    await ctx.send(embed=embed)
+    await outbox.send(ctx, embed=embed)
 
 @bot.event
 async def on_command_error(ctx, error):
     """Handle command errors"""
     if isinstance(error, commands.CommandNotFound):
-        await ctx.send("❌ Command not found! Use `/help` to see available commands.")
+        await outbox.send(ctx, "❌ Command not found! Use `/help` to see available commands.")
     elif isinstance(error, commands.MissingRequiredArgument):
-        await ctx.send(f"❌ Missing required argument! Use `/help` for command usage.")
+        await outbox.send(ctx, f"❌ Missing required argument! Use `/help` for command usage.")
     else:
-        await ctx.send(f"❌ An error occurred: {str(error)}")
+        await outbox.send(ctx, f"❌ An error occurred: {str(error)}")
         print(f"Error: {error}")
 
 # Cleanup on shutdown
@@ -477,4 +2217,5 @@ if __name__ == "__main__":
         print("❌ Error: DISCORD_BOT_TOKEN not found in environment variables!")
         print("Please create a .env file with your bot token.")
     else:
-        bot.run(TOKEN)
\ No newline at end of file
+        bot.run(TOKEN)
+        scraper.parser.shutdown()
\ No newline at end of file
@@ -0,0 +1,77 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault('LYRICS_DB_PATH', '')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+
+def probing_scraper(send):
+    """Scraper whose breaker is due for a probe, with send replaced by the given coroutine"""
+    scraper = main.GeniusScraper()
+    scraper.breaker = main.CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    scraper.breaker.record_failure()
+
+    async def no_session():
+        pass
+
+    scraper.create_session = no_session
+    scraper.send = send
+    return scraper
+
+
+async def rate_limited(url, params, reader):
+    return 429, None
+
+
+async def out_of_time(url, params, reader):
+    raise main.DeadlineExceeded("No time left to contact Genius")
+
+
+async def bad_body(url, params, reader):
+    raise ValueError("not JSON")
+
+
+async def hangs(url, params, reader):
+    await asyncio.sleep(60)
+
+
+async def succeeds(url, params, reader):
+    return 200, 'ok'
+
+
+@pytest.mark.parametrize('send, error', [
+    (rate_limited, main.GeniusUnavailable),
+    (out_of_time, main.DeadlineExceeded),
+    (bad_body, ValueError),
+])
+def test_unfinished_probe_reopens_breaker(send, error):
+    scraper = probing_scraper(send)
+    with pytest.raises(error):
+        asyncio.run(scraper.request('https://genius.com/x'))
+    assert scraper.breaker.state == 'open'
+    assert scraper.breaker.allow()
+
+
+def test_cancelled_probe_reopens_breaker():
+    scraper = probing_scraper(hangs)
+
+    async def cancel_probe():
+        task = asyncio.create_task(scraper.request('https://genius.com/x'))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_probe())
+    assert scraper.breaker.state == 'open'
+
+
+def test_successful_probe_closes_breaker():
+    scraper = probing_scraper(succeeds)
+    assert asyncio.run(scraper.request('https://genius.com/x')) == 'ok'
+    assert scraper.breaker.state == 'closed'
@@ -0,0 +1,56 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault('LYRICS_DB_PATH', '')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+
+async def slow_lookup(seconds):
+    """Stands in for a network stage that gives up once its deadline has passed"""
+    await asyncio.sleep(seconds)
+    if main.remaining_time(default=1.0) <= 0:
+        raise main.DeadlineExceeded("No time left")
+    return main.remaining_time()
+
+
+async def caller(scraper, budget, delay, lookup_seconds):
+    await asyncio.sleep(delay)
+    async with main.command_deadline(budget):
+        return await scraper.coalesce('key', lambda: slow_lookup(lookup_seconds))
+
+
+def test_shared_lookup_runs_until_the_latest_waiters_deadline():
+    scraper = main.GeniusScraper()
+
+    async def run():
+        return await asyncio.gather(
+            caller(scraper, 0.3, 0, 0.5),
+            caller(scraper, 5, 0.1, 0.5),
+            return_exceptions=True
+        )
+
+    first, second = asyncio.run(run())
+    assert isinstance(first, TimeoutError)
+    # Still bounded by the second caller's deadline rather than unlimited
+    assert second is not None and 0 < second < 5
+
+
+def test_shared_lookup_is_cancelled_once_every_waiter_gave_up():
+    scraper = main.GeniusScraper()
+
+    async def run():
+        with pytest.raises(TimeoutError):
+            await caller(scraper, 0.1, 0, 5)
+        return scraper.in_flight
+
+    assert asyncio.run(run()) == {}
+
+
+def test_lookup_without_a_deadline_has_none():
+    scraper = main.GeniusScraper()
+    assert asyncio.run(scraper.coalesce('key', lambda: slow_lookup(0))) is None